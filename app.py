@@ -1,29 +1,66 @@
 import os
 import json
-from flask import Flask, request, render_template_string, redirect, url_for
+from datetime import timedelta
+from flask import Flask, Response, jsonify, request, render_template, redirect, stream_with_context, url_for
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+# Load .env before the local modules below read their settings from the environment.
+load_dotenv()
+
 import re
-from google.cloud import translate_v2 as translate # Import Google Cloud Translation API
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import backends
+from backends import GEMINI_MODEL, GENERATION_CONFIG, BackendError
+from arabic_text import lookup_key, tokenize, tokenize_many
+from assets import StaticAssets
+from exercise_cache import EXERCISE_CACHE_TTL_SECONDS, ExerciseCache
+from exercise_pool import EXERCISE_POOL_WORKERS, ExercisePool
+from grading import grade
+from lexicon import Lexicon
+from metrics import Metrics
+from response_cache import ResponseCache, response_key
+from section_parser import SectionParser
+from singleflight import SingleFlight
+from translation_cache import TranslationCache
+from warmup import WARMUP_RECENT_RESPONSES, CacheWarmer
+from word_scheduler import WordScheduler
+from redis_store import USER_DATA_URL, RedisExerciseCache
+from users import (UserSpace, UserSpaces, current_user_id, open_user_store, secret_key, stored_user_ids,
+                   user_store_exists)
 
 app = Flask(__name__)
-load_dotenv()
+static_assets = StaticAssets(app)
 
-# Configure Gemini API (for text generation)
+# Stage timings and counters; /metrics with METRICS_ENABLED=1, Server-Timing
+# headers with SERVER_TIMING=1.
+metrics = Metrics()
+metrics.init_app(app)
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+# Compile the page templates once at startup instead of on the first request.
+for template_name in ("index.html", "practice.html"):
+    app.jinja_env.get_template(template_name)
 
-# Configure Google Cloud Translation API
-# The library automatically looks for GOOGLE_APPLICATION_CREDENTIALS environment variable
-# pointing to your service account key file.
-translate_client = translate.Client()
+# Generation and translation backends are imported and built on first use
+# (see backends.py); this only reports in the background which ones are usable.
+backends.start_self_check()
 
 WORDS_FILE = "arabic_words.json"
 
-# This dictionary will now primarily store manually added words and their translations.
-# Dynamically generated words will be translated on-the-fly.
-# You can pre-fill this with common words if you like.
-translations = {
+# Every user has their own vocabulary store (see users.open_user_store: a
+# local SQLite file, or Redis when USER_DATA_URL is set for several nodes),
+# seeded from WORDS_FILE on their first write and found again through the
+# user id in their signed session cookie. Until then they read the shared
+# guest store, which only holds WORDS_FILE. Translations, the lexicon and
+# generated responses are shared by everyone.
+app.secret_key = secret_key()
+app.permanent_session_lifetime = timedelta(days=365)
+
+# Seed translations for common words. They are copied into the shared
+# translation cache on startup; everything else is translated on demand and
+# cached there so every worker (and every restart) can reuse it. The cache is
+# keyed by arabic_text.lookup_key, so spelling variants share one entry.
+SEED_TRANSLATIONS = {
     "كتاب": "book",
     "مدرسة": "school",
     "قلم": "pen",
@@ -39,53 +76,236 @@ translations = {
     "من": "from / of",
 }
 
+TRANSLATION_ERROR = "Translation Error"
+
+# When set, GET /practice returns the page shell immediately and streams the
+# exercise over Server-Sent Events; ?stream=1 / ?stream=0 overrides it per request.
+STREAM_PRACTICE = os.getenv("STREAM_PRACTICE", "0") == "1"
 
+translation_cache = TranslationCache()
+translation_cache.seed({lookup_key(w): t for w, t in SEED_TRANSLATIONS.items()})
 
+# Offline dictionary consulted before the cache and the model (see lexicon.py).
+lexicon = Lexicon()
+
+metrics.add_collector(lambda: {
+    "translation_cache_hits_total": translation_cache.hits,
+    "translation_cache_misses_total": translation_cache.misses,
+})
+
+
+# Words sent to the model per prompt, however large the vocabulary grows.
+PROMPT_WORDS = int(os.getenv("PROMPT_WORDS", "10"))
 
 def load_words():
-    """Loads Arabic words from a JSON file."""
-    if os.path.exists(WORDS_FILE):
-        with open(WORDS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    """Returns the current user's word list, reloading it only when their store has changed."""
+    with metrics.span("load_words"):
+        return current_space().store.words()
+
+def prompt_words(scheduler, exclude=()):
+    """Returns the words due for practice, at most PROMPT_WORDS of them, skipping ``exclude``."""
+    with metrics.span("schedule"):
+        return scheduler.pick(PROMPT_WORDS, exclude)
 
-def save_words(words):
-    """Saves Arabic words to a JSON file."""
-    with open(WORDS_FILE, "w", encoding="utf-8") as f:
-        json.dump(words, f, ensure_ascii=False, indent=2)
+def add_word(word):
+    """Adds one Arabic word for the current user. Returns False if it was already saved."""
+    space = current_space(write=True)
+    return space.store.add(word)
 
-import requests
+# Cache-missed words are translated in batches of this size, one Ollama call
+# per batch, with at most TRANSLATION_CONCURRENCY batches in flight.
+TRANSLATION_BATCH_SIZE = 40
+TRANSLATION_CONCURRENCY = 4
 
-import requests
+# How long a worker may hold a word it is translating before other workers
+# stop waiting for it and translate the word themselves.
+TRANSLATION_LEASE_SECONDS = 30
+
+translation_flights = SingleFlight()
 
 def get_english_translation(text):
-    """Translate Arabic to English using Ollama's local LLM (e.g., Mistral)."""
+    """Translate Arabic to English with the configured translation backend (Ollama by default)."""
     try:
-        prompt = f"Translate this Arabic sentence to English in one word please :\n\n{text}"
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "mistral",
-                "prompt": prompt,
-                "stream": False
-            }
-        )
-        response.raise_for_status()
-        return response.json()["response"].strip()
-    except Exception as e:
-        return "Translation Error"
-    
-def generate_with_gemini(prompt_text):
-    """Generates content using the specified Gemini model and handles responses."""
-    model = genai.GenerativeModel("models/gemma-3-12b-it") # Ensure this model is valid
+        metrics.inc("llm_calls_total", backend=backends.TRANSLATION_BACKEND)
+        return backends.translation().translate(text)
+    except BackendError as e:
+        metrics.inc("backend_errors_total", backend=backends.TRANSLATION_BACKEND)
+        print(f"Translation of '{text}' failed: {e}")
+        return TRANSLATION_ERROR
+
+def get_english_translations(words):
+    """Translates a batch of Arabic words with a single backend call.
+
+    Returns a dict of word -> translation. Words the backend leaves out of its
+    reply are translated one by one so every word gets an answer. If the
+    batch call itself fails, the backend is not asked again word by word:
+    every word gets TRANSLATION_ERROR, which is not cached, so a later
+    request retries.
+    """
+    try:
+        metrics.inc("llm_calls_total", backend=backends.TRANSLATION_BACKEND)
+        results = backends.translation().translate_batch(words)
+    except BackendError as e:
+        metrics.inc("backend_errors_total", backend=backends.TRANSLATION_BACKEND)
+        print(f"Batch translation failed: {e}")
+        return {word: TRANSLATION_ERROR for word in words}
+
+    for word in words:
+        if word not in results:
+            results[word] = get_english_translation(word)
+    return results
+
+def local_translations(keys, record_stats=True):
+    """Returns the translations available without a model call: lexicon, then cache."""
+    found = lexicon.get_many(keys)
+    found.update(translation_cache.get_many([k for k in keys if k not in found], record_stats=record_stats))
+    return found
+
+def _translate_batch(keys, surfaces):
+    """Sends the words as written to the model and returns their translations by lookup key."""
+    words = {surfaces.get(k, k): k for k in keys}
+    return {words[w]: t for w, t in get_english_translations(list(words)).items() if w in words}
+
+def _translate_batches(keys, surfaces):
+    """Translates keys in concurrent batches, caching and yielding each batch's dict."""
+    batches = [keys[i:i + TRANSLATION_BATCH_SIZE] for i in range(0, len(keys), TRANSLATION_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(TRANSLATION_CONCURRENCY, len(batches))) as executor:
+        for future in as_completed([executor.submit(_translate_batch, batch, surfaces) for batch in batches]):
+            translated = future.result()
+            translation_cache.set_many({k: t for k, t in translated.items() if t != TRANSLATION_ERROR})
+            yield translated
+
+def _translate_leased(keys, surfaces):
+    """Translates keys this process owns, coordinating with other workers.
+
+    Keys leased by another worker are not sent to the model again; instead
+    the shared cache is polled until that worker stores them. If its lease
+    ends without a result (failure or crash), the key is leased and
+    translated here.
+    """
+    pending = list(keys)
+    delay = 0.05
+    while pending:
+        claimed = translation_cache.claim(pending, TRANSLATION_LEASE_SECONDS)
+        try:
+            # Another worker may have finished between our cache read and the claim.
+            done = translation_cache.get_many(claimed, record_stats=False)
+            if done:
+                yield done
+            todo = [k for k in claimed if k not in done]
+            if todo:
+                yield from _translate_batches(todo, surfaces)
+        finally:
+            translation_cache.release(claimed)
+        pending = [k for k in pending if k not in claimed]
+        if not pending:
+            return
+
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        done = translation_cache.get_many(pending, record_stats=False)
+        if done:
+            yield done
+            pending = [k for k in pending if k not in done]
+
+def iter_translations(keys, surfaces=None, record_stats=True):
+    """Yields dicts of translations for many lookup keys as they become available.
+
+    ``surfaces`` maps a key to the word as it appeared in the text; the model
+    is asked about that word, since the normalized key can read as a
+    different word. Results are still cached and returned by key.
+    ``record_stats=False`` keeps background lookups out of the cache
+    hit/miss counters.
+
+    Lexicon and cached translations come first in a single dict. Misses are
+    deduplicated, split into TRANSLATION_BATCH_SIZE chunks and the chunks are
+    sent to the model concurrently, each chunk's dict being yielded as soon as
+    it is done, so latency grows with the number of batches rather than the
+    number of words.
+
+    Concurrent lookups of the same missing key are coalesced: one thread (and,
+    through leases in the shared cache, one worker) asks the model while the
+    others wait for its answer.
+    """
+    keys = list(dict.fromkeys(k for k in keys if k))
+    found = local_translations(keys, record_stats)
+    if found:
+        yield found
+    missing = [k for k in keys if k not in found]
+    if not missing:
+        return
+
+    owned, waiting = translation_flights.claim(missing)
+    try:
+        for translated in _translate_leased(list(owned), surfaces or {}):
+            translation_flights.resolve(owned, translated)
+            yield translated
+    finally:
+        translation_flights.abandon(owned, TRANSLATION_ERROR)
+    if waiting:
+        yield {key: future.result() for key, future in waiting.items()}
+
+def lookup_translations(keys, surfaces=None, record_stats=True):
+    """Returns a dict of translations for many lookup keys (see iter_translations)."""
+    found = {}
+    for translated in iter_translations(keys, surfaces, record_stats):
+        found.update(translated)
+    return found
+
+def token_surfaces(tokens):
+    """Returns the tokens' lookup keys and a dict of key -> the first word written with it."""
+    surfaces = {}
+    for token in tokens:
+        if token.key:
+            surfaces.setdefault(token.key, token.text)
+    return list(surfaces), surfaces
+
+def annotate_with_translations(*texts):
+    """Returns, for each text, its tokens paired with their English translations.
+
+    All texts are translated together so they share a single batched lookup.
+    """
+    token_lists = tokenize_many(texts)
+    with metrics.span("translate"):
+        found = lookup_translations(*token_surfaces(token for tokens in token_lists for token in tokens))
+    return [
+        [{'arabic': token.text, 'english': found.get(token.key, "") if token.key else ""} for token in tokens]
+        for tokens in token_lists
+    ]
+
+response_cache = ResponseCache()
+
+def get_gemini_model():
+    """Returns the shared generation model handle, creating it on first use."""
+    return backends.generation()
 
+def generate_with_gemini(prompt_text):
+    """Generates content using the specified Gemini model and handles responses.
+
+    Successful responses are kept in the response cache; once a prompt has
+    enough stored variants they are served in rotation without calling the API.
+    """
+    key = response_key(GEMINI_MODEL, prompt_text, GENERATION_CONFIG)
+    cached = response_cache.get(key)
+    if cached is not None:
+        metrics.inc("response_cache_hits_total")
+        return cached
+
+    metrics.inc("response_cache_misses_total")
+    with metrics.span("generate"):
+        return _generate_uncached(key, prompt_text)
+
+def _generate_uncached(key, prompt_text):
     try:
+        model = get_gemini_model()
+        metrics.inc("llm_calls_total", backend=backends.GENERATION_BACKEND)
         response = model.generate_content(prompt_text)
         if response.candidates:
             candidate = response.candidates[0]
 
             if candidate.content and candidate.content.parts and hasattr(candidate.content.parts[0], 'text'):
                 generated_text = candidate.content.parts[0].text
+                response_cache.add(key, generated_text)
                 return generated_text
             else:
                 return "No text content could be extracted from the model's response."
@@ -96,23 +316,60 @@ def generate_with_gemini(prompt_text):
             return "No content could be generated for this prompt (blocked or empty response)."
 
     except Exception as e:
+        metrics.inc("backend_errors_total", backend=backends.GENERATION_BACKEND)
         print(f"An error occurred during content generation: {e}")
         return f"An error occurred: {e}"
 
+PARENTHESES_PATTERN = re.compile(r'\s*\([^)]*\)\s*')
+SENTENCE_END_PATTERN = re.compile(r'[.؟!]$')
+
+def stream_with_gemini(prompt_text, is_complete=None):
+    """Yields the model's output for a prompt in chunks as they are generated.
+
+    A cached response is yielded whole. Closing the generator early stops
+    reading the stream, which abandons the rest of the generation; the text
+    received up to then is cached only if ``is_complete()`` returns True,
+    i.e. the caller already got everything it needed from it. A stream cut
+    short any other way (an error, a disconnected client) is not cached.
+    """
+    key = response_key(GEMINI_MODEL, prompt_text, GENERATION_CONFIG)
+    cached = response_cache.get(key)
+    if cached is not None:
+        metrics.inc("response_cache_hits_total")
+        yield cached
+        return
+
+    metrics.inc("response_cache_misses_total")
+    received = []
+    failed = False
+    finished = False
+    try:
+        model = get_gemini_model()
+        metrics.inc("llm_calls_total", backend=backends.GENERATION_BACKEND)
+        for chunk in model.generate_content(prompt_text, stream=True):
+            received.append(chunk.text)
+            yield chunk.text
+        finished = True
+    except Exception as e:
+        failed = True
+        metrics.inc("backend_errors_total", backend=backends.GENERATION_BACKEND)
+        print(f"An error occurred during content generation: {e}")
+    finally:
+        if received and not failed and (finished or (is_complete is not None and is_complete())):
+            response_cache.add(key, "".join(received))
+
 def parse_sentence_and_question(generated_text):
     """Parses the generated text to extract the Arabic sentence and question."""
     sentence = "No sentence found."
     question = "No question found."
 
-    sentence_match = re.search(r'\*\*Sentence:\*\*\s*(.*?)(?:\s*\*\*Translation:|\s*\*\*Question:|$)', generated_text, re.DOTALL)
-    if sentence_match:
-        sentence = sentence_match.group(1).strip()
-        sentence = re.sub(r'\s*\([^)]*\)\s*', '', sentence).strip()
-
-    question_match = re.search(r'\*\*Question:\*\*\s*(.*?)(?:\s*\*\*Translation:|\s*\*\*Breakdown:|$)', generated_text, re.DOTALL)
-    if question_match:
-        question = question_match.group(1).strip()
-        question = re.sub(r'\s*\([^)]*\)\s*', '', question).strip()
+    sections = SectionParser()
+    sections.feed(generated_text)
+    sections.close()
+    if "sentence" in sections.sections:
+        sentence = PARENTHESES_PATTERN.sub('', sections.sections["sentence"]).strip()
+    if "question" in sections.sections:
+        question = PARENTHESES_PATTERN.sub('', sections.sections["question"]).strip()
 
     if sentence == "No sentence found." and "؟" in generated_text:
         parts = generated_text.split("؟", 1)
@@ -124,7 +381,7 @@ def parse_sentence_and_question(generated_text):
         if question_candidate and len(question_candidate.split()) > 2:
             question = question_candidate
 
-    if sentence and not re.search(r'[.؟!]$', sentence) and sentence != "No sentence found.":
+    if sentence and not SENTENCE_END_PATTERN.search(sentence) and sentence != "No sentence found.":
         sentence += "."
 
     if question and not question.endswith("؟") and question != "No question found.":
@@ -133,8 +390,231 @@ def parse_sentence_and_question(generated_text):
     if not question or question == "No question found.":
         question = "ما السؤال المتعلق بهذه الجملة؟"
 
+    if sentence == "No sentence found.":
+        metrics.inc("parse_failures_total")
+
     return sentence, question
 
+JSON_DECODER = json.JSONDecoder()
+EXERCISE_FIELDS = ("sentence", "question", "answer")
+
+MAX_QUESTIONS = 10
+
+def practice_prompt(words):
+    """Returns the generation prompt for a practice sentence, question and reference answer."""
+    return (
+        f"Write a simple Arabic sentence containing the following words: {', '.join(words)}. "
+        "Then write a question related to it and a short Arabic answer to that question. "
+        "Format the reply as **Sentence:** ..., **Question:** ... and **Answer:** ..., each on its own line."
+    )
+
+def practice_batch_prompt(words, count):
+    """Returns the generation prompt for ``count`` exercises as JSON."""
+    return (
+        f"Write {count} different simple Arabic sentences using the following words: {', '.join(words)}. "
+        "For each sentence, also write a question related to it and a short answer to that question. "
+        f'Reply only with a JSON array of {count} objects with the keys "sentence", "question" and "answer", all in Arabic.'
+    )
+
+def _finish_sentence(sentence):
+    sentence = PARENTHESES_PATTERN.sub('', sentence).strip()
+    if sentence and not SENTENCE_END_PATTERN.search(sentence):
+        sentence += "."
+    return sentence
+
+def _finish_question(question):
+    question = PARENTHESES_PATTERN.sub('', question).strip()
+    if not question:
+        return "ما السؤال المتعلق بهذه الجملة؟"
+    return question if question.endswith("؟") else question + "؟"
+
+def _json_exercise_items(generated_text):
+    """Returns the exercise objects of the first JSON array in the text that has any.
+
+    Decoding starts at each ``[`` in turn, so brackets in surrounding prose
+    do not matter. Objects whose fields are not strings are dropped.
+    """
+    start = generated_text.find("[")
+    while start != -1:
+        try:
+            parsed, _ = JSON_DECODER.raw_decode(generated_text, start)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, list):
+            items = [
+                item for item in parsed
+                if isinstance(item, dict) and isinstance(item.get("sentence"), str) and item["sentence"].strip()
+                and all(isinstance(item.get(field, ""), (str, type(None))) for field in EXERCISE_FIELDS)
+            ]
+            if items:
+                return items
+        start = generated_text.find("[", start + 1)
+    return []
+
+def parse_exercises(generated_text, count, count_failures=True):
+    """Parses up to ``count`` (sentence, question, answer) triples from a batch generation.
+
+    Reads the JSON array the batch prompt asks for, tolerating code fences and
+    surrounding prose, and falls back to **Sentence:** / **Question:** /
+    **Answer:** sections when the model answered in markdown instead. The
+    answer is "" when the model gave none. Unparseable text counts towards
+    parse_failures_total unless ``count_failures`` is False.
+    """
+    items = _json_exercise_items(generated_text)
+    if not items:
+        for field, text in SectionParser.parse(generated_text, EXERCISE_FIELDS):
+            if field == "sentence" or not items:
+                items.append({})
+            items[-1][field] = text
+
+    exercises = [
+        (_finish_sentence(item.get("sentence") or ""),
+         _finish_question(item.get("question") or ""),
+         PARENTHESES_PATTERN.sub('', item.get("answer") or "").strip())
+        for item in items
+    ]
+    exercises = [e for e in exercises if e[0]][:count]
+    if not exercises and count_failures:
+        metrics.inc("parse_failures_total")
+    return exercises
+
+def build_exercises(words, count):
+    """Generates ``count`` practice exercises for the given words with one model call.
+
+    The tokens of every sentence and question are translated together in a
+    single deduplicated pass. May return fewer exercises than requested.
+    """
+    parsed = parse_exercises(generate_with_gemini(practice_batch_prompt(words, count)), count)
+    annotated = annotate_with_translations(*[text for sentence, question, _ in parsed for text in (sentence, question)])
+    return [
+        {
+            "sentence": sentence,
+            "question": question,
+            "answer": answer,
+            "words": words,
+            "sentence_words_with_translations": annotated[2 * i],
+            "question_words_with_translations": annotated[2 * i + 1],
+        }
+        for i, (sentence, question, answer) in enumerate(parsed)
+    ]
+
+def take_exercises(space, count):
+    """Returns up to ``count`` exercises on the words due for review in ``space``.
+
+    Pre-generated ones come first, the rest from one model call.
+    """
+    words = prompt_words(space.scheduler)
+    exercises = []
+    while len(exercises) < count:
+        exercise = space.pool.pop(words)
+        if exercise is None:
+            break
+        exercises.append(exercise)
+    if len(exercises) < count:
+        exercises += build_exercises(words, count - len(exercises))
+    return exercises
+
+def serve_exercises(space, exercises):
+    """Stores exercises that are about to be shown and holds their words back from the next ones.
+
+    The words are rescheduled for real when the answers are graded. The
+    shared guest schedule is left as it is.
+    """
+    exercises = exercise_cache.put_many(exercises)
+    if space.user_id != GUEST_USER_ID:
+        space.scheduler.defer([w for e in exercises for w in e.get("words", [])])
+    return exercises
+
+# Exercises kept ready per active user.
+USER_EXERCISE_POOL_SIZE = int(os.getenv("USER_EXERCISE_POOL_SIZE", "3"))
+
+def open_user_space(user_id):
+    store = open_user_store(user_id, seed_json=WORDS_FILE)
+    scheduler = WordScheduler(store)
+    # One exercise per refill, each on the most overdue words the queued
+    # exercises do not cover yet, so serving one leaves the others current.
+    # Small vocabularies, all of whose words are queued, start over.
+    pool = ExercisePool(
+        lambda taken: build_exercises(prompt_words(scheduler, taken) or prompt_words(scheduler), 1),
+        size=USER_EXERCISE_POOL_SIZE,
+        workers=min(EXERCISE_POOL_WORKERS, 1),
+    )
+    return UserSpace(user_id, store, scheduler, pool)
+
+user_spaces = UserSpaces(open_user_space)
+
+# Stands in for visitors who have not written anything yet, so crawlers,
+# health checks and first page views create no cookie and no store.
+GUEST_USER_ID = "guest"
+
+def current_space(write=False):
+    """Returns the word store, review schedule and exercise pool of the session's user.
+
+    Reads by a visitor without a store of their own get the shared guest
+    space. ``write`` assigns a user id if needed and opens (creating and
+    seeding) the user's own store.
+    """
+    user_id = current_user_id(create=write)
+    if user_id is None or not (write or user_store_exists(user_id)):
+        user_id = GUEST_USER_ID
+    return user_spaces.get(user_id)
+
+def active_words():
+    """Returns the words of every user with an open space in this process."""
+    return [word for space in user_spaces.values() for word in space.store.words()]
+
+def all_user_words():
+    """Returns the words of every user with a store, open or not."""
+    words = []
+    for user_id in stored_user_ids():
+        words += open_user_store(user_id).words()
+    return words
+
+def recent_exercise_texts(limit=WARMUP_RECENT_RESPONSES):
+    """Returns the sentences and questions of recently generated responses."""
+    return [
+        text
+        for response in response_cache.recent(limit)
+        for sentence, question, _ in parse_exercises(response, MAX_QUESTIONS, count_failures=False)
+        for text in (sentence, question)
+    ]
+
+# Translates the vocabulary and recent exercises in the background so that
+# pages mostly find their words cached. Its reads stay out of the
+# translation cache hit/miss counters, which measure traffic.
+cache_warmer = CacheWarmer(
+    [active_words, recent_exercise_texts],
+    lambda keys: local_translations(keys, record_stats=False),
+    lambda keys, surfaces: lookup_translations(keys, surfaces, record_stats=False),
+)
+
+# Served exercises, looked up by id when answers are submitted.
+exercise_cache = RedisExerciseCache(EXERCISE_CACHE_TTL_SECONDS) if USER_DATA_URL else ExerciseCache()
+
+FEEDBACK = {
+    "correct": "✅ إجابة صحيحة!",
+    "partial": "🟡 إجابتك قريبة من الإجابة الصحيحة.",
+    "wrong": "❌ الإجابة غير صحيحة.",
+    "ungraded": "✅ تم استلام إجابتك!",
+}
+
+def grade_answers(exercises, answers):
+    """Grades answers against the exercises' reference answers in one batch.
+
+    Returns a (score, verdict) pair per answer (see grading.grade). The
+    prompt words of exercises answered correctly are scheduled further
+    out; those of exercises answered wrongly or partly come up again soon.
+    """
+    results = grade(answers, [e.get("answer") for e in exercises])
+    missed = [w for e, (_, verdict) in zip(exercises, results) if verdict in ("wrong", "partial") for w in e.get("words", [])]
+    known = [w for e, (_, verdict) in zip(exercises, results) if verdict == "correct" for w in e.get("words", [])]
+    known = [w for w in known if w not in set(missed)]
+    if missed or known:
+        space = current_space(write=True)
+        space.scheduler.review(known, correct=True)
+        space.scheduler.review(missed, correct=False)
+    return results
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     words = load_words()
@@ -143,178 +623,28 @@ def index():
     if request.method == "POST":
         new_word = request.form.get("new_word", "").strip()
         if new_word:
-            # If a new word is added, dynamically translate it and add to translations
-            if new_word not in translations:
-                translated_word = get_english_translation(new_word)
-                translations[new_word] = translated_word
-                print(f"Dynamically translated '{new_word}' to '{translated_word}' and added to translations.")
-
-            if new_word not in words:
-                words.append(new_word)
-                save_words(words)
+            if add_word(new_word):
+                # Translated off the request path by the cache warmer
+                cache_warmer.wake()
+                words = load_words()
                 message = f'Word "{new_word}" added.'
-            elif new_word in words:
+            else:
                 message = f'Word "{new_word}" already exists.'
         else:
             message = "Please enter a valid word."
 
-    words_with_translations = [(w, translations.get(w, "")) for w in words]
-
-    return render_template_string("""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8" />
-        <title>Arabic With AAeshah</title>
-        <style>
-            body { font-family: Arial; background-color: #f8f9fa; margin: 30px; }
-            .container { max-width: 900px; margin: auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-            input[type="text"] { width: 100%; font-size: 18px; padding: 12px; margin-bottom: 10px; border: 2px solid #ddd; border-radius: 6px; direction: rtl; text-align: right; }
-            input[type="submit"] { background-color: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 6px; cursor: pointer; font-size: 16px; }
-            .word-list { margin-top: 20px; background-color: #f8f9fa; padding: 20px; border-radius: 8px; }
-            #arabicKeyboard, #arabicKeyboardPractice { margin-top: 15px; display: flex; flex-wrap: wrap; gap: 5px; }
-            #arabicKeyboard button, #arabicKeyboardPractice button { font-size: 16px; padding: 8px 12px; border: none; border-radius: 4px; background-color: #e2e6ea; cursor: pointer; }
-            #arabicKeyboard button:hover, #arabicKeyboardPractice button:hover { background-color: #d6d8db; }
-            #micButton, #micButtonPractice { margin-top: 10px; cursor: pointer; font-size: 24px; background: none; border: none; }
-
-            /* Tooltip Styles */
-            .arabic-word-with-translation {
-                position: relative;
-                display: inline-block;
-                cursor: help; /* Changes cursor to a question mark */
-                border-bottom: 1px dotted #888; /* Dotted underline */
-            }
-
-            .arabic-word-with-translation .tooltip-text {
-                visibility: hidden;
-                width: auto; /* Adjust width based on content */
-                background-color: #555;
-                color: #fff;
-                text-align: center;
-                border-radius: 6px;
-                padding: 5px 10px;
-                position: absolute;
-                z-index: 1;
-                bottom: 125%; /* Position above the text */
-                left: 50%;
-                margin-left: -50%; /* Center the tooltip */
-                opacity: 0;
-                transition: opacity 0.3s;
-                white-space: nowrap; /* Keep translation on one line */
-                direction: ltr; /* Ensure tooltip text is LTR */
-                text-align: left; /* Align tooltip text left */
-            }
-
-            .arabic-word-with-translation .tooltip-text::after {
-                content: "";
-                position: absolute;
-                top: 100%;
-                left: 50%;
-                margin-left: -5px;
-                border-width: 5px;
-                border-style: solid;
-                border-color: #555 transparent transparent transparent;
-            }
-
-            .arabic-word-with-translation:hover .tooltip-text {
-                visibility: visible;
-                opacity: 1;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Arabic With AAeshah</h1>
-            <form method="POST">
-                <label>Enter an Arabic word:</label>
-                <input type="text" name="new_word" id="new_word" autocomplete="off" />
-                <input type="submit" value="Add Word" />
-            </form>
-            <p>{{ message }}</p>
-
-            <h3>Arabic Keyboard</h3>
-            <div id="arabicKeyboard">
-                {% for char in "ابتثجحخدذرزسشصضطظعغفقكلمنهويءئؤةًٌٍَُِْٓ" %}
-                    <button type="button" onclick="insertChar('{{ char }}', 'new_word')">{{ char }}</button>
-                {% endfor %}
-                <button type="button" onclick="clearInput('new_word')">Clear</button>
-            </div>
-
-            <button type="button" id="micButton" onclick="startRecognition('new_word')">🎤</button>
-            <div id="speechStatus"></div>
-
-            <div class="word-list">
-                <h2>Your Words</h2>
-                <ul>
-                    {% for word, translation in words_with_translations %}
-                        <li><strong>{{ word }}</strong>{% if translation %} - {{ translation }}{% endif %}</li>
-                    {% else %}
-                        <li>No words added yet.</li>
-                    {% endfor %}
-                </ul>
-            </div>
-
-            <p>
-                <a href="{{ url_for('practice') }}" style="background-color:#007bff; color:white; padding:10px 20px; text-decoration:none; border-radius:6px;">Start Practice</a>
-            </p>
-        </div>
-
-        <script>
-        function insertChar(char, targetId) {
-            const inputField = document.getElementById(targetId);
-            if (inputField) {
-                inputField.value += char;
-            }
-        }
-        function clearInput(targetId) {
-            const inputField = document.getElementById(targetId);
-            if (inputField) {
-                inputField.value = '';
-            }
-        }
+    keys = [lookup_key(w) for w in words]
+    cached = local_translations(keys)
+    words_with_translations = [(w, cached.get(k, "")) for w, k in zip(words, keys)]
 
-        var recognition;
-        function startRecognition(targetId) {
-            const statusDiv = document.getElementById(targetId === 'new_word' ? 'speechStatus' : 'speechStatusPractice');
-            const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
-            if (!SpeechRecognition) {
-                alert("Speech Recognition not supported in this browser.");
-                if (statusDiv) statusDiv.textContent = "Speech Recognition not supported.";
-                return;
-            }
-
-            recognition = new SpeechRecognition();
-            recognition.lang = 'ar-SA';
-            recognition.interimResults = false;
-            recognition.maxAlternatives = 1;
-
-            recognition.onstart = () => { if (statusDiv) statusDiv.textContent = "🎙 Listening..."; };
-            recognition.onerror = (event) => { if (statusDiv) statusDiv.textContent = "❌ Error: " + event.error; };
-            recognition.onend = () => { if (statusDiv) statusDiv.textContent = "Stopped."; };
-            recognition.onresult = (event) => {
-                let transcript = event.results[0][0].transcript;
-                const inputField = document.getElementById(targetId);
-                if (inputField) {
-                    inputField.value += transcript;
-                }
-                if (statusDiv) statusDiv.textContent = "✅ You said: " + transcript;
-            };
-            recognition.start();
-        }
-        </script>
-    </body>
-    </html>
-    """, words_with_translations=words_with_translations, message=message)
+    with metrics.span("render"):
+        return render_template("index.html", words_with_translations=words_with_translations, message=message)
 
 @app.route("/practice", methods=["GET", "POST"])
 def practice():
-    sentence = ""
-    question = ""
-    user_answer = ""
-    feedback = ""
-    sentence_words_with_translations = []  
-    question_words_with_translations = []  
+    exercises = []
     num_questions = 1  # Default number of questions
+    streaming = False
 
     words = load_words()
 
@@ -322,253 +652,275 @@ def practice():
         return redirect(url_for("index"))
 
     if request.method == "POST":
-        user_answer = request.form.get("user_answer", "").strip()
-        question = request.form.get("question", "").strip()
-        original_sentence = request.form.get("original_sentence", "").strip()
-        num_questions = int(request.form.get("num_questions", 1))  # Get dropdown value
-
-        # Process original sentence for display with translations
-        sentence_parts = re.findall(r'\b\w+\b|[.,!?;]', original_sentence)
-        for word_part in sentence_parts:
-            cleaned_word = re.sub(r'[.?!,]', '', word_part)
-            translation = translations.get(cleaned_word, None)
-            if translation is None:
-                translation = get_english_translation(cleaned_word)
-            sentence_words_with_translations.append({'arabic': word_part, 'english': translation})
-        sentence = original_sentence
-
-        # Process question for display with translations
-        question_parts = re.findall(r'\b\w+\b|[.,!?;]', question)
-        for word_part in question_parts:
-            cleaned_word = re.sub(r'[.?!,]', '', word_part)
-            translation = translations.get(cleaned_word, None)
-            if translation is None and cleaned_word:
-                translation = get_english_translation(cleaned_word)
-            elif not cleaned_word:
-                translation = ""
-            elif translation is None:
-                translation = "No translation available"
-            question_words_with_translations.append({'arabic': word_part, 'english': translation})
-
-        feedback = "✅ تم استلام إجابتك!" if user_answer else "❌ الرجاء إدخال إجابة."
+        ids = request.form.getlist("exercise_id")
+        sentences = request.form.getlist("original_sentence")
+        questions = request.form.getlist("question")
+        answers = [a.strip() for a in request.form.getlist("user_answer")]
+        num_questions = request.form.get("num_questions", len(sentences) or 1, type=int)  # Get dropdown value
+
+        # Served exercises come back from the exercise cache with their
+        # translations; only expired ones are rebuilt from the posted text.
+        stored = exercise_cache.get_many(ids)
+        for i, (sentence, question) in enumerate(zip(sentences, questions)):
+            exercise_id = ids[i] if i < len(ids) else ""
+            exercises.append(stored.get(exercise_id) or {"sentence": sentence.strip(), "question": question.strip()})
+        rebuilt = [e for e in exercises if "sentence_words_with_translations" not in e]
+        annotated = annotate_with_translations(*[text for e in rebuilt for text in (e["sentence"], e["question"])])
+        for i, exercise in enumerate(rebuilt):
+            exercise["sentence_words_with_translations"] = annotated[2 * i]
+            exercise["question_words_with_translations"] = annotated[2 * i + 1]
+
+        answers += [""] * (len(exercises) - len(answers))
+        for exercise, user_answer, (score, verdict) in zip(exercises, answers, grade_answers(exercises, answers)):
+            exercise["user_answer"] = user_answer
+            if not user_answer:
+                exercise["feedback"] = "❌ الرجاء إدخال إجابة."
+            else:
+                exercise["feedback"] = FEEDBACK[verdict]
+            exercise["show_answer"] = verdict in ("wrong", "partial")
 
     else:
-        # Generate new sentence and question
-        prompt = f"Write a simple Arabic sentence containing the following words: {', '.join(words)}. Then write a question related to it."
-        generated = generate_with_gemini(prompt)
-        sentence, question = parse_sentence_and_question(generated)
-
-        # Process sentence for display
-        sentence_parts = re.findall(r'\b\w+\b|[.,!?;]', sentence)
-        for word_part in sentence_parts:
-            cleaned_word = re.sub(r'[.?!,]', '', word_part)
-            translation = translations.get(cleaned_word, None)
-            if translation is None and cleaned_word:
-                translation = get_english_translation(cleaned_word)
-            elif not cleaned_word:
-                translation = ""
-            elif translation is None:
-                translation = "No translation available"
-            sentence_words_with_translations.append({'arabic': word_part, 'english': translation})
-
-        # Process question for display
-        question_parts = re.findall(r'\b\w+\b|[.,!?;]', question)
-        for word_part in question_parts:
-            cleaned_word = re.sub(r'[.?!,]', '', word_part)
-            translation = translations.get(cleaned_word, None)
-            if translation is None and cleaned_word:
-                translation = get_english_translation(cleaned_word)
-            elif not cleaned_word:
-                translation = ""
-            elif translation is None:
-                translation = "No translation available"
-            question_words_with_translations.append({'arabic': word_part, 'english': translation})
-
-    return render_template_string("""
-    <!DOCTYPE html>
-    <html lang="ar" dir="rtl">
-    <head>
-        <meta charset="UTF-8" />
-        <title>Practice - Arabic With AAeshah</title>
-        <style>
-            body { font-family: Arial; background-color: #f0f0f0; margin: 30px; direction: rtl; }
-            .container { max-width: 900px; margin: auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-            label, h2 { font-weight: bold; margin-top: 20px; }
-            textarea { width: 100%; font-size: 20px; padding: 12px; border: 2px solid #ddd; border-radius: 6px; direction: rtl; text-align: right; }
-            input[type="submit"] { margin-top: 20px; background-color: #28a745; color: white; padding: 12px 24px; border: none; border-radius: 6px; cursor: pointer; font-size: 16px; }
-            .feedback { margin-top: 20px; font-size: 18px; color: #333; }
-            .back-link { margin-top: 20px; display: inline-block; color: #007bff; text-decoration: none; }
-            #arabicKeyboard, #arabicKeyboardPractice { margin-top: 15px; display: flex; flex-wrap: wrap; gap: 5px; }
-            #arabicKeyboard button, #arabicKeyboardPractice button { font-size: 16px; padding: 8px 12px; border: none; border-radius: 4px; background-color: #e2e6ea; cursor: pointer; }
-            #arabicKeyboard button:hover, #arabicKeyboardPractice button:hover { background-color: #d6d8db; }
-            #micButton, #micButtonPractice { margin-top: 10px; cursor: pointer; font-size: 24px; background: none; border: none; }
-
-            .arabic-word-with-translation {
-                position: relative;
-                display: inline-block;
-                cursor: help;
-                border-bottom: 1px dotted #888;
-                font-size: 24px;
-                margin-left: 5px;
-            }
-
-            .arabic-word-with-translation .tooltip-text {
-                visibility: hidden;
-                width: auto;
-                background-color: #555;
-                color: #fff;
-                text-align: center;
-                border-radius: 6px;
-                padding: 5px 10px;
-                position: absolute;
-                z-index: 1;
-                bottom: 125%;
-                left: 50%;
-                transform: translateX(-50%);
-                opacity: 0;
-                transition: opacity 0.3s;
-                white-space: nowrap;
-                direction: ltr;
-                text-align: left;
-            }
-
-            .arabic-word-with-translation .tooltip-text::after {
-                content: "";
-                position: absolute;
-                top: 100%;
-                left: 50%;
-                margin-left: -5px;
-                border-width: 5px;
-                border-style: solid;
-                border-color: #555 transparent transparent transparent;
-            }
-
-            .arabic-word-with-translation:hover .tooltip-text {
-                visibility: visible;
-                opacity: 1;
-            }
-            .sentence-display {
-                font-size: 24px;
-                text-align: right;
-                line-height: 1.8;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h2>تمرين القراءة والكتابة</h2>
-            <form method="POST">
-                <p><strong>الجملة:</strong> <span class="sentence-display">
-                    {% for word_data in sentence_words_with_translations %}
-                        <span class="arabic-word-with-translation">
-                            {{ word_data.arabic }}
-                            {% if word_data.english %}
-                                <span class="tooltip-text">{{ word_data.english }}</span>
-                            {% endif %}
-                        </span>
-                    {% endfor %}
-                </span></p>
-
-                <p><strong>السؤال:</strong> <span class="sentence-display">
-                    {% for word_data in question_words_with_translations %}
-                        <span class="arabic-word-with-translation">
-                            {{ word_data.arabic }}
-                            {% if word_data.english %}
-                                <span class="tooltip-text">{{ word_data.english }}</span>
-                            {% endif %}
-                        </span>
-                    {% endfor %}
-                </span></p>
-
-                <input type="hidden" name="question" value="{{ question }}">
-                <input type="hidden" name="original_sentence" value="{{ sentence }}">
-
-                <label for="num_questions">كم عدد الأسئلة التي تريد أن تُسأل؟</label>
-                <select name="num_questions" id="num_questions" required>
-                    {% for n in range(1, 11) %}
-                        <option value="{{ n }}" {% if n == num_questions %}selected{% endif %}>{{ n }}</option>
-                    {% endfor %}
-                </select>
-
-                <label for="user_answer">إجابتك:</label>
-                <textarea name="user_answer" id="user_answer" rows="4" required>{{ user_answer }}</textarea>
-
-                <h3>لوحة المفاتيح العربية</h3>
-                <div id="arabicKeyboardPractice">
-                    {% for char in "ابتثجحخدذرزسشصضطظعغفقكلمنهويءئؤةًٌٍَُِْٓ" %}
-                        <button type="button" onclick="insertChar('{{ char }}', 'user_answer')">{{ char }}</button>
-                    {% endfor %}
-                    <button type="button" onclick="clearInput('user_answer')">مسح</button>
-                </div>
-
-                <button type="button" id="micButtonPractice" onclick="startRecognition('user_answer')">🎤</button>
-                <div id="speechStatusPractice"></div>
-
-                <input type="submit" value="أرسل الإجابة">
-            </form>
-
-            {% if feedback %}
-                <div class="feedback">{{ feedback }}</div>
-            {% endif %}
-
-            <p>
-                <a class="back-link" href="{{ url_for('index') }}">⟵ الرجوع إلى الصفحة الرئيسية</a>
-            </p>
-        </div>
-
-        <script>
-        function insertChar(char, targetId) {
-            const inputField = document.getElementById(targetId);
-            if (inputField) {
-                inputField.value += char;
-            }
-        }
-        function clearInput(targetId) {
-            const inputField = document.getElementById(targetId);
-            if (inputField) {
-                inputField.value = '';
-            }
-        }
-
-        var recognition;
-        function startRecognition(targetId) {
-            const statusDiv = document.getElementById(targetId === 'new_word' ? 'speechStatus' : 'speechStatusPractice');
-            const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
-            if (!SpeechRecognition) {
-                alert("Speech Recognition not supported in this browser.");
-                if (statusDiv) statusDiv.textContent = "Speech Recognition not supported.";
-                return;
-            }
-
-            recognition = new SpeechRecognition();
-            recognition.lang = 'ar-SA';
-            recognition.interimResults = false;
-            recognition.maxAlternatives = 1;
-
-            recognition.onstart = () => { if (statusDiv) statusDiv.textContent = "🎙 Listening..."; };
-            recognition.onerror = (event) => { if (statusDiv) statusDiv.textContent = "❌ Error: " + event.error; };
-            recognition.onend = () => { if (statusDiv) statusDiv.textContent = "Stopped."; };
-            recognition.onresult = (event) => {
-                let transcript = event.results[0][0].transcript;
-                const inputField = document.getElementById(targetId);
-                if (inputField) {
-                    inputField.value += transcript;
-                }
-                if (statusDiv) statusDiv.textContent = "✅ You said: " + transcript;
-            };
-            recognition.start();
+        num_questions = min(max(request.args.get("num_questions", 1, type=int), 1), MAX_QUESTIONS)
+        if num_questions == 1 and request.args.get("stream", "1" if STREAM_PRACTICE else "0") == "1":
+            # Send the page shell right away; practice.js fills in the sentence,
+            # question and translations from /practice/events as they are ready.
+            streaming = True
+            exercises = [{"sentence": "", "question": "", "sentence_words_with_translations": [], "question_words_with_translations": []}]
+        else:
+            # Serve pre-generated exercises, generating the rest inline with one model call
+            space = current_space()
+            exercises = serve_exercises(space, take_exercises(space, num_questions))
+
+    if not exercises:
+        exercises = [{
+            "sentence": "No sentence found.",
+            "question": "ما السؤال المتعلق بهذه الجملة؟",
+            "sentence_words_with_translations": [],
+            "question_words_with_translations": [],
+        }]
+
+    with metrics.span("render"):
+        return render_template("practice.html",
+             exercises=exercises,
+             num_questions=num_questions,
+             max_questions=MAX_QUESTIONS,
+             streaming=streaming)
+
+def sse_event(event, data):
+    """Formats one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route("/practice/events")
+def practice_events():
+    """Streams a practice exercise as Server-Sent Events.
+
+    Sends ``sentence`` and ``question`` events with the tokens to display,
+    then one ``translations`` event (lookup key -> English) per finished
+    translation batch, then ``exercise`` with the id answers are posted
+    with, then ``done``. Without any saved words only ``done`` is sent, with
+    an ``error`` message.
+    """
+    space = current_space()
+
+    def field_event(field, text):
+        tokens = [{"arabic": t.text, "key": t.key} for t in tokenize(text)]
+        return sse_event(field, {"text": text, "tokens": tokens})
+
+    def events():
+        if not space.store.words():
+            yield sse_event("done", {"error": "No words saved yet."})
+            return
+        chosen = prompt_words(space.scheduler)
+        exercise = space.pool.pop(chosen)
+        if exercise is not None:
+            yield sse_event("sentence", {"text": exercise["sentence"], "tokens": exercise["sentence_words_with_translations"]})
+            yield sse_event("question", {"text": exercise["question"], "tokens": exercise["question_words_with_translations"]})
+            serve_exercises(space, [exercise])
+            yield sse_event("exercise", {"id": exercise["id"]})
+            yield sse_event("done", {})
+            return
+
+        # Send the sentence and question as soon as their sections are
+        # complete and stop the generation once the reference answer is in
+        # too, instead of waiting for the full reply. The sentence's words are
+        # translated while the rest is still being generated.
+        sections = SectionParser(EXERCISE_FIELDS)
+        received = []
+        sent = {}
+        prefetch = ThreadPoolExecutor(max_workers=1)
+        prefetched = None
+        chunks = stream_with_gemini(practice_prompt(chosen), is_complete=lambda: sections.done)
+        try:
+            with metrics.span("generate"):
+                for chunk in chunks:
+                    received.append(chunk)
+                    for field, text in sections.feed(chunk):
+                        if field in ("sentence", "question") and field not in sent:
+                            sent[field] = _finish_sentence(text) if field == "sentence" else _finish_question(text)
+                            yield field_event(field, sent[field])
+                            if field == "sentence" and not sections.done:
+                                prefetched = prefetch.submit(lookup_translations, *token_surfaces(tokenize(sent[field])))
+                    if sections.done:
+                        break
+        finally:
+            chunks.close()
+            prefetch.shutdown(wait=False)
+
+        for field, text in sections.close():
+            if field in ("sentence", "question") and field not in sent:
+                sent[field] = _finish_sentence(text) if field == "sentence" else _finish_question(text)
+                yield field_event(field, sent[field])
+        if "sentence" not in sent:
+            sentence, question = parse_sentence_and_question("".join(received))
+            sent["sentence"] = sentence
+            yield field_event("sentence", sentence)
+            if "question" not in sent:
+                sent["question"] = question
+                yield field_event("question", question)
+        elif "question" not in sent:
+            sent["question"] = _finish_question("")
+            yield field_event("question", sent["question"])
+
+        keys, surfaces = token_surfaces(t for text in sent.values() for t in tokenize(text))
+        found = {}
+        if prefetched is not None:
+            found = prefetched.result()
+            yield sse_event("translations", found)
+            keys = [k for k in keys if k not in found]
+        for translated in iter_translations(keys, surfaces):
+            found.update(translated)
+            yield sse_event("translations", translated)
+
+        sentence_tokens, question_tokens = tokenize_many([sent["sentence"], sent["question"]])
+        (exercise,) = serve_exercises(space, [{
+            "sentence": sent["sentence"],
+            "question": sent["question"],
+            "answer": PARENTHESES_PATTERN.sub('', sections.sections.get("answer", "")).strip(),
+            "words": chosen,
+            "sentence_words_with_translations": [{'arabic': t.text, 'english': found.get(t.key, "")} for t in sentence_tokens],
+            "question_words_with_translations": [{'arabic': t.text, 'english': found.get(t.key, "")} for t in question_tokens],
+        }])
+        yield sse_event("exercise", {"id": exercise["id"]})
+        yield sse_event("done", {})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Versioned JSON API for the mobile client and load tests.
+
+API_MAX_WORDS = 1000
+API_MAX_EXERCISES = MAX_QUESTIONS
+
+def api_error(message, status=400):
+    return jsonify({"error": message}), status
+
+def json_word_list():
+    """Returns the "words" list from a JSON request body, or None if it is invalid."""
+    payload = request.get_json(silent=True) or {}
+    words = payload.get("words")
+    if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+        return None
+    return [w.strip() for w in words if w.strip()]
+
+@app.route("/healthz")
+def healthz():
+    """Reports which generation and translation backends passed the startup self-check."""
+    return jsonify({
+        kind: {name: {"available": available, "detail": detail} for name, (available, detail) in checked.items()}
+        for kind, checked in backends.status.items()
+    })
+
+@app.route("/api/v1/translate", methods=["POST"])
+def api_translate():
+    """Translates a list of Arabic words: {"words": [...]} -> {"translations": {word: english}}."""
+    words = json_word_list()
+    if words is None:
+        return api_error('Expected a JSON body like {"words": ["كتاب", ...]}.')
+    if len(words) > API_MAX_WORDS:
+        return api_error(f"At most {API_MAX_WORDS} words per request.")
+
+    keys = {w: lookup_key(w) for w in words}
+    found = lookup_translations(keys.values(), {k: w for w, k in keys.items()})
+    return jsonify({"translations": {w: found.get(k, "") for w, k in keys.items()}})
+
+@app.route("/api/v1/exercise")
+def api_exercise():
+    """Returns ``count`` practice exercises (default 1) with their token translations."""
+    count = request.args.get("count", 1, type=int)
+    if not 1 <= count <= API_MAX_EXERCISES:
+        return api_error(f"count must be between 1 and {API_MAX_EXERCISES}.")
+    words = load_words()
+    if not words:
+        return api_error("No words saved yet.", 409)
+
+    space = current_space()
+    exercises = serve_exercises(space, take_exercises(space, count))
+    if not exercises:
+        return api_error("The model did not produce an exercise.", 502)
+
+    return jsonify({"exercises": [
+        {
+            "id": e["id"],
+            "sentence": e["sentence"],
+            "question": e["question"],
+            "sentence_tokens": e["sentence_words_with_translations"],
+            "question_tokens": e["question_words_with_translations"],
         }
-        </script>
-    </body>
-    </html>
-    """, sentence=sentence,
-         question=question,
-         user_answer=user_answer,
-         feedback=feedback,
-         sentence_words_with_translations=sentence_words_with_translations,
-         question_words_with_translations=question_words_with_translations,
-         num_questions=num_questions)
+        for e in exercises
+    ]})
+
+@app.route("/api/v1/grade", methods=["POST"])
+def api_grade():
+    """Grades a batch of answers: {"answers": [{"id": ..., "answer": ...}]} -> {"results": [...]}.
+
+    Each result has the exercise id, a 0-1 ``score`` (null when the exercise
+    had no reference answer), a ``verdict`` and the reference answer;
+    unknown or expired ids get the verdict "unknown".
+    """
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("answers")
+    if not isinstance(items, list) or not all(
+        isinstance(i, dict) and isinstance(i.get("id"), str) and isinstance(i.get("answer"), str) for i in items
+    ):
+        return api_error('Expected a JSON body like {"answers": [{"id": "...", "answer": "..."}]}.')
+    if len(items) > API_MAX_WORDS:
+        return api_error(f"At most {API_MAX_WORDS} answers per request.")
+
+    stored = exercise_cache.get_many(i["id"] for i in items)
+    known = [i for i in items if i["id"] in stored]
+    grades = iter(grade_answers([stored[i["id"]] for i in known], [i["answer"] for i in known]))
+    results = []
+    for item in items:
+        exercise = stored.get(item["id"])
+        score, verdict = next(grades) if exercise else (None, "unknown")
+        results.append({
+            "id": item["id"],
+            "score": score,
+            "verdict": verdict,
+            "reference_answer": exercise.get("answer") if exercise else None,
+        })
+    return jsonify({"results": results})
+
+@app.route("/api/v1/words", methods=["POST"])
+def api_words():
+    """Adds a list of Arabic words: {"words": [...]} -> {"added": [...], "total": n}."""
+    words = json_word_list()
+    if words is None:
+        return api_error('Expected a JSON body like {"words": ["كتاب", ...]}.')
+    if len(words) > API_MAX_WORDS:
+        return api_error(f"At most {API_MAX_WORDS} words per request.")
+
+    space = current_space(write=True)
+    added = space.store.add_many(words)
+    if added:
+        cache_warmer.wake()
+    return jsonify({"added": added, "total": len(space.store)})
 
 
 if __name__ == "__main__":
+    cache_warmer.start()
     app.run(debug=True)
\ No newline at end of file
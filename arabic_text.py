@@ -0,0 +1,70 @@
+import os
+import re
+from collections import namedtuple
+
+# Off by default: the prefixes also begin many whole words (الله, لبنان, وزير).
+SPLIT_CLITICS = os.getenv("SPLIT_CLITICS", "0") == "1"
+
+# Harakat, Quranic annotation marks and the superscript alef.
+TASHKEEL_PATTERN = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+TATWEEL = "\u0640"
+ALEF_VARIANTS_PATTERN = re.compile("[\u0622\u0623\u0625\u0671]")  # آ أ إ ٱ
+ALEF_MAKSURA = "\u0649"  # ى
+TA_MARBUTA = "\u0629"  # ة
+
+# Words may carry diacritics and tatweel, which \w alone does not match.
+TOKEN_PATTERN = re.compile(r"[\w\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]+|[.,!?;؟،؛]")
+PUNCTUATION_PATTERN = re.compile(r"^[.,!?;؟،؛]+$")
+
+# Prefixes stripped when clitic splitting is on, longest first, each with the
+# shortest stem it may leave behind so short words such as بيت stay whole.
+CLITIC_PREFIXES = (
+    ("وال", 2),
+    ("بال", 2),
+    ("لل", 2),
+    ("ال", 2),
+    ("و", 3),
+    ("ب", 3),
+    ("ل", 3),
+)
+
+Token = namedtuple("Token", ["text", "key"])
+Token.__doc__ = "A token as written (``text``) and its canonical lookup ``key`` ('' for punctuation)."
+
+
+def normalize(word):
+    """Returns the orthographic normal form of an Arabic word.
+
+    Removes tashkeel and tatweel and folds alef variants to bare alef,
+    alef maksura to ya and ta marbuta to ha.
+    """
+    word = TASHKEEL_PATTERN.sub("", word).replace(TATWEEL, "")
+    word = ALEF_VARIANTS_PATTERN.sub("ا", word)
+    return word.replace(ALEF_MAKSURA, "ي").replace(TA_MARBUTA, "ه")
+
+
+def strip_clitics(word):
+    """Removes one leading conjunction/preposition/article cluster from a normalized word."""
+    for prefix, min_stem in CLITIC_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= min_stem:
+            return word[len(prefix):]
+    return word
+
+
+def lookup_key(word, split_clitics=SPLIT_CLITICS):
+    """Returns the canonical translation-cache key for a word ('' for punctuation)."""
+    if PUNCTUATION_PATTERN.match(word):
+        return ""
+    key = normalize(word)
+    return strip_clitics(key) if split_clitics else key
+
+
+def tokenize(text, split_clitics=SPLIT_CLITICS):
+    """Splits text into Tokens, keeping the original spelling for display."""
+    return [Token(part, lookup_key(part, split_clitics)) for part in TOKEN_PATTERN.findall(text)]
+
+
+def tokenize_many(texts, split_clitics=SPLIT_CLITICS):
+    """Tokenizes several texts; returns one token list per text."""
+    return [tokenize(text, split_clitics) for text in texts]
+
@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "1") == "1"
+COMPRESS_MIN_BYTES = 500
+ASSET_MAX_AGE = 365 * 24 * 3600
+AVAILABLE_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = {"text/html", "text/css", "application/javascript", "text/javascript", "application/json"}
+
+
+def preferred_encoding(accept_encodings, available):
+    """Returns the best of the ``available`` encodings the client accepts, or None.
+
+    ``accept_encodings`` is the parsed Accept-Encoding header
+    (``request.accept_encodings``), so q-values count and ``q=0`` refuses an
+    encoding. Brotli wins over gzip at equal quality.
+    """
+    candidates = [encoding for encoding in ("br", "gzip") if encoding in available]
+    return accept_encodings.best_match(candidates) if candidates else None
+
+
+def compress(body, encoding, level=6):
+    if encoding == "br":
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=level)
+
+
+class StaticAssets:
+    """Serves the files under ``static/`` from memory under content-hashed names.
+
+    Every file is read, hashed and pre-compressed once at startup and served
+    from ``/assets/<name>.<hash>.<ext>`` with a one-year immutable cache
+    lifetime; templates get the current URL from ``asset_url``. Dynamic HTML
+    and JSON responses get an ETag, conditional-GET handling and on-the-fly
+    compression.
+    """
+
+    def __init__(self, app, folder=None):
+        self.folder = folder or app.static_folder
+        self.urls = {}
+        self._files = {}
+        for root, _, filenames in os.walk(self.folder):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.folder).replace(os.sep, "/")
+                self._add(name, path)
+
+        app.add_url_rule("/assets/<path:filename>", "asset", self.serve)
+        app.add_template_global(self.asset_url)
+        app.after_request(self.finalize_response)
+
+    def _add(self, name, path):
+        with open(path, "rb") as f:
+            body = f.read()
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        hashed_name = f"{stem}.{digest}{ext}"
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        variants = {None: body}
+        if mimetype in COMPRESSIBLE_TYPES and len(body) >= COMPRESS_MIN_BYTES:
+            for encoding in AVAILABLE_ENCODINGS:
+                variants[encoding] = compress(body, encoding, level=9)
+        self.urls[name] = hashed_name
+        self._files[hashed_name] = (mimetype, digest, variants)
+
+    def asset_url(self, name):
+        """Returns the content-hashed URL of a static file."""
+        return "/assets/" + self.urls[name]
+
+    def serve(self, filename):
+        if filename not in self._files:
+            abort(404)
+        mimetype, digest, variants = self._files[filename]
+        encoding = preferred_encoding(request.accept_encodings, variants)
+
+        response = Response(variants[encoding], mimetype=mimetype)
+        response.set_etag(f"{digest}-{encoding}" if encoding else digest)
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+        response.vary.add("Accept-Encoding")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        return response.make_conditional(request)
+
+    def finalize_response(self, response):
+        """Adds ETag / conditional GET and compression to dynamic responses."""
+        if (
+            request.endpoint == "asset"
+            or response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        body = response.get_data()
+        encoding = None
+        if COMPRESS_RESPONSES and len(body) >= COMPRESS_MIN_BYTES and "Content-Encoding" not in response.headers:
+            encoding = preferred_encoding(request.accept_encodings, AVAILABLE_ENCODINGS)
+            response.vary.add("Accept-Encoding")
+
+        # The ETag names the encoding too, so a cached gzip body is never
+        # revalidated as if it were the identity one.
+        digest = hashlib.sha1(body).hexdigest()
+        response.set_etag(f"{digest}-{encoding}" if encoding else digest)
+        if request.method in ("GET", "HEAD"):
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if encoding:
+            response.set_data(compress(body, encoding))
+            response.headers["Content-Encoding"] = encoding
+        return response
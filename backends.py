@@ -0,0 +1,189 @@
+import importlib.util
+import json
+import os
+import threading
+
+import requests
+
+from ollama_client import OLLAMA_URL, OllamaClient, OllamaError
+
+GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "gemini")
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "ollama")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemma-3-12b-it")
+GENERATION_CONFIG = {"temperature": float(os.getenv("GEMINI_TEMPERATURE", "1.0"))}
+
+
+class BackendError(Exception):
+    """Raised when a backend cannot be built or fails to answer."""
+
+
+_factories = {"generation": {}, "translation": {}}
+_checks = {"generation": {}, "translation": {}}
+_instances = {}
+_lock = threading.Lock()
+
+# Result of the last check_backends() run, {kind: {name: (available, detail)}}.
+status = {}
+
+
+def register(kind, name, check=None):
+    """Registers a backend factory; ``check`` returns (available, detail) without building it."""
+    def decorator(factory):
+        _factories[kind][name] = factory
+        if check is not None:
+            _checks[kind][name] = check
+        return factory
+    return decorator
+
+
+def get(kind, name=None):
+    """Returns the configured backend of a kind, importing and building it on first use."""
+    if name is None:
+        name = GENERATION_BACKEND if kind == "generation" else TRANSLATION_BACKEND
+    with _lock:
+        if (kind, name) not in _instances:
+            if name not in _factories[kind]:
+                raise BackendError(f"Unknown {kind} backend '{name}'")
+            try:
+                _instances[(kind, name)] = _factories[kind][name]()
+            except Exception as e:
+                raise BackendError(f"Could not start {kind} backend '{name}': {e}") from e
+        return _instances[(kind, name)]
+
+
+def generation():
+    return get("generation")
+
+
+def translation():
+    return get("translation")
+
+
+def check_backends():
+    """Checks whether the configured backends look usable, without building them."""
+    results = {}
+    for kind, name in (("generation", GENERATION_BACKEND), ("translation", TRANSLATION_BACKEND)):
+        check = _checks[kind].get(name)
+        if name not in _factories[kind]:
+            results[kind] = {name: (False, "unknown backend")}
+        elif check is None:
+            results[kind] = {name: (True, "no check")}
+        else:
+            try:
+                results[kind] = {name: check()}
+            except Exception as e:
+                results[kind] = {name: (False, str(e))}
+    status.update(results)
+    return results
+
+
+def start_self_check():
+    """Runs check_backends on a daemon thread and prints the result."""
+    def run():
+        for kind, backends in check_backends().items():
+            for name, (available, detail) in backends.items():
+                print(f"{kind} backend '{name}': {'available' if available else 'UNAVAILABLE'} ({detail})")
+    threading.Thread(target=run, name="backend-self-check", daemon=True).start()
+
+
+def _module_available(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+def _check_gemini():
+    if not _module_available("google.generativeai"):
+        return False, "google-generativeai is not installed"
+    if not os.getenv("GOOGLE_API_KEY"):
+        return False, "GOOGLE_API_KEY is not set"
+    return True, GEMINI_MODEL
+
+
+@register("generation", "gemini", check=_check_gemini)
+def _gemini():
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    return genai.GenerativeModel(GEMINI_MODEL, generation_config=GENERATION_CONFIG)
+
+
+class OllamaTranslator:
+    """Translates words with a local Ollama model."""
+
+    def __init__(self, client=None):
+        self.client = client or OllamaClient()
+
+    def translate(self, text):
+        """Returns the first line of the model's answer, stopping generation once it is complete."""
+        prompt = f"Translate this Arabic sentence to English in one word please :\n\n{text}"
+        chunks = self.client.stream(prompt)
+        received = ""
+        try:
+            for chunk in chunks:
+                received += chunk
+                if "\n" in received.lstrip():
+                    break
+        except OllamaError as e:
+            raise BackendError(str(e)) from e
+        finally:
+            chunks.close()
+        return received.strip().split("\n", 1)[0].strip()
+
+    def translate_batch(self, words):
+        """Returns {word: translation} for the words the model answered; may be partial."""
+        prompt = (
+            "Translate each of these Arabic words to English in one word. "
+            "Reply only with a JSON object mapping every Arabic word to its English translation.\n\n"
+            + json.dumps(words, ensure_ascii=False)
+        )
+        try:
+            parsed = json.loads(self.client.generate(prompt, format="json"))
+        except (OllamaError, ValueError) as e:
+            raise BackendError(str(e)) from e
+        if not isinstance(parsed, dict):
+            return {}
+        return {w: str(parsed[w]).strip() for w in words if parsed.get(w)}
+
+
+def _check_ollama():
+    try:
+        requests.get(OLLAMA_URL.rstrip("/") + "/api/tags", timeout=2).raise_for_status()
+    except requests.RequestException as e:
+        return False, f"{OLLAMA_URL} unreachable: {e.__class__.__name__}"
+    return True, OLLAMA_URL
+
+
+register("translation", "ollama", check=_check_ollama)(OllamaTranslator)
+
+
+class GoogleTranslator:
+    """Translates words with the Google Cloud Translation API."""
+
+    def __init__(self):
+        from google.cloud import translate_v2
+
+        # Reads the key file named by GOOGLE_APPLICATION_CREDENTIALS.
+        self.client = translate_v2.Client()
+
+    def translate(self, text):
+        return self.translate_batch([text])[text]
+
+    def translate_batch(self, words):
+        try:
+            results = self.client.translate(words, source_language="ar", target_language="en")
+        except Exception as e:
+            raise BackendError(str(e)) from e
+        return {word: result["translatedText"] for word, result in zip(words, results)}
+
+
+def _check_google_translate():
+    if not _module_available("google.cloud.translate_v2"):
+        return False, "google-cloud-translate is not installed"
+    if not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+        return False, "GOOGLE_APPLICATION_CREDENTIALS is not set"
+    return True, "Cloud Translation v2"
+
+
+register("translation", "google", check=_check_google_translate)(GoogleTranslator)
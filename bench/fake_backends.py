@@ -0,0 +1,168 @@
+"""Local stand-ins for the Ollama and Gemini backends used by the benchmarks."""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+FUNCTION_WORDS = ["في", "من", "هو", "هي", "على", "إلى", "هذا", "ذلك", "مع", "عند"]
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+BATCH_PROMPT_PATTERN = re.compile(r"JSON array of (\d+)")
+
+
+class Latency:
+    """Samples artificial backend latency (seconds) from a named distribution."""
+
+    def __init__(self, mean, jitter=0.0, distribution="normal", seed=None):
+        self.mean = mean
+        self.jitter = jitter
+        self.distribution = distribution
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.distribution == "uniform":
+                value = self._random.uniform(self.mean - self.jitter, self.mean + self.jitter)
+            elif self.distribution == "exponential":
+                value = self._random.expovariate(1 / self.mean) if self.mean else 0.0
+            elif self.distribution == "lognormal":
+                sigma = self.jitter / self.mean if self.mean else 0.0
+                value = self.mean * self._random.lognormvariate(0, sigma)
+            else:
+                value = self._random.gauss(self.mean, self.jitter)
+        return max(value, 0.0)
+
+    def wait(self):
+        time.sleep(self.sample())
+
+
+def random_word(rng, length=None):
+    return "".join(rng.choice(LETTERS) for _ in range(length or rng.randint(3, 7)))
+
+
+class CallCounter:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def increment(self):
+        with self._lock:
+            self.calls += 1
+
+    def reset(self):
+        with self._lock:
+            calls, self.calls = self.calls, 0
+        return calls
+
+
+class FakeOllama(CallCounter):
+    """HTTP server answering ``POST /api/generate`` like Ollama does.
+
+    Single-word prompts are answered with ``en:<word>``; ``format=json``
+    batch prompts get a JSON object translating every word in the list.
+    Streaming requests get the answer as newline-delimited JSON.
+    """
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.increment()
+                fake.latency.wait()
+                prompt = body["prompt"]
+                if body.get("format") == "json":
+                    words = json.loads(prompt[prompt.index("["):])
+                    text = json.dumps({w: f"en:{w}" for w in words}, ensure_ascii=False)
+                else:
+                    text = "en:" + prompt.rsplit("\n", 1)[-1].strip()
+                if body.get("stream"):
+                    lines = [{"response": text, "done": False}, {"response": "", "done": True}]
+                    payload = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+                else:
+                    payload = json.dumps({"response": text, "done": True}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+class FakeGeminiModel(CallCounter):
+    """Stands in for ``genai.GenerativeModel``: ``generate_content`` sleeps, then
+    returns a response shaped like the real one.
+
+    Sentences mix words from ``vocabulary`` with common function
+    words and, at ``novel_word_rate``, words the translation cache has never
+    seen, so cold/warm cache scenarios behave like real traffic. Prompts
+    asking for a "JSON array of N" exercises get N of them as JSON. With
+    ``stream=True`` the text comes back word by word, the latency spread
+    over the chunks.
+    """
+
+    def __init__(self, latency, vocabulary, sentence_length=10, novel_word_rate=0.2, seed=None):
+        super().__init__()
+        self.latency = latency
+        self.vocabulary = list(vocabulary) + FUNCTION_WORDS
+        self.sentence_length = sentence_length
+        self.novel_word_rate = novel_word_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _words(self, count):
+        with self._lock:
+            return [
+                random_word(self._random) if self._random.random() < self.novel_word_rate
+                else self._random.choice(self.vocabulary)
+                for _ in range(count)
+            ]
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.increment()
+        if stream:
+            return self._stream(self._text(prompt), self.latency.sample())
+        self.latency.wait()
+        part = SimpleNamespace(text=self._text(prompt))
+        candidate = SimpleNamespace(content=SimpleNamespace(parts=[part]))
+        return SimpleNamespace(candidates=[candidate], prompt_feedback=None)
+
+    def _stream(self, text, duration):
+        chunks = text.split(" ")
+        for i, chunk in enumerate(chunks):
+            time.sleep(duration / len(chunks))
+            yield SimpleNamespace(text=chunk if i == len(chunks) - 1 else chunk + " ")
+
+    def _text(self, prompt):
+        batch = BATCH_PROMPT_PATTERN.search(prompt)
+        exercises = [
+            (" ".join(self._words(self.sentence_length)) + ".",
+             "أين " + " ".join(self._words(max(self.sentence_length // 2, 1))) + "؟",
+             " ".join(self._words(3)) + ".")
+            for _ in range(int(batch.group(1)) if batch else 1)
+        ]
+        if batch:
+            return json.dumps([{"sentence": s, "question": q, "answer": a} for s, q, a in exercises], ensure_ascii=False)
+        sentence, question, answer = exercises[0]
+        return f"**Sentence:** {sentence}\n**Question:** {question}\n**Answer:** {answer}\n**Translation:** ..."
@@ -0,0 +1,171 @@
+"""Benchmarks the `/` and `/practice` hot paths against local fake backends.
+
+Each scenario (vocabulary size x cold/warm translation cache) runs in a fresh
+subprocess with its own working directory, word list and caches. The Flask
+app is served on a local port and driven by ``--concurrency`` client threads;
+the report lists latency percentiles, throughput and model calls per page view.
+
+    python bench/run.py --vocab-sizes 10,100,1000 --caches cold,warm --concurrency 8
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_backends import FakeGeminiModel, FakeOllama, Latency, random_word
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", default="/practice", help="comma-separated paths to request in rotation")
+    parser.add_argument("--requests", type=int, default=100, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--vocab-sizes", default="10,100,1000")
+    parser.add_argument("--caches", default="cold,warm", help="cold, warm or both")
+    parser.add_argument("--distribution", default="normal", choices=["normal", "lognormal", "uniform", "exponential"])
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="mean seconds per Ollama call")
+    parser.add_argument("--ollama-jitter", type=float, default=0.05)
+    parser.add_argument("--gemini-latency", type=float, default=1.0, help="mean seconds per Gemini call")
+    parser.add_argument("--gemini-jitter", type=float, default=0.2)
+    parser.add_argument("--novel-word-rate", type=float, default=0.2,
+                        help="share of generated words outside the vocabulary")
+    parser.add_argument("--pool-workers", type=int, default=0,
+                        help="exercise pre-generation workers (0 measures the inline path)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def drive(base_url, paths, total, concurrency):
+    """Issues ``total`` GETs across ``concurrency`` threads. Returns (latencies, errors, wall time)."""
+    import requests
+
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        response = session.get(base_url + paths[i % len(paths)])
+        return time.perf_counter() - start, response.status_code >= 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    wall = time.perf_counter() - started
+    return sorted(r[0] for r in results), sum(r[1] for r in results), wall
+
+
+def run_scenario(args, vocab_size, cache_state):
+    """Runs one scenario in this process and returns its result dict."""
+    rng = random.Random(args.seed)
+    os.chdir(tempfile.mkdtemp(prefix="arabic-bench-"))
+    vocabulary = list(dict.fromkeys(random_word(rng) for _ in range(vocab_size)))
+    with open("arabic_words.json", "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f, ensure_ascii=False)
+
+    ollama = FakeOllama(Latency(args.ollama_latency, args.ollama_jitter, args.distribution, args.seed)).start()
+    gemini = FakeGeminiModel(
+        Latency(args.gemini_latency, args.gemini_jitter, args.distribution, args.seed),
+        vocabulary,
+        novel_word_rate=args.novel_word_rate,
+        seed=args.seed,
+    )
+    os.environ["OLLAMA_URL"] = ollama.url
+    os.environ["EXERCISE_POOL_WORKERS"] = str(args.pool_workers)
+
+    sys.path.insert(0, REPO_ROOT)
+    import app as webapp
+    webapp.get_gemini_model = lambda: gemini
+
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, webapp.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    paths = args.paths.split(",")
+
+    if cache_state == "warm":
+        drive(base_url, paths, args.requests, args.concurrency)
+    ollama.reset()
+    gemini.reset()
+
+    latencies, errors, wall = drive(base_url, paths, args.requests, args.concurrency)
+    server.shutdown()
+    ollama.stop()
+    return {
+        "vocab_size": vocab_size,
+        "cache": cache_state,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "throughput_rps": args.requests / wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "ollama_calls_per_view": ollama.calls / args.requests,
+        "gemini_calls_per_view": gemini.calls / args.requests,
+    }
+
+
+def print_table(results):
+    columns = [
+        ("vocab", "vocab_size", 7, "d"),
+        ("cache", "cache", 5, "s"),
+        ("req/s", "throughput_rps", 8, ".1f"),
+        ("p50 ms", "p50_ms", 9, ".1f"),
+        ("p95 ms", "p95_ms", 9, ".1f"),
+        ("p99 ms", "p99_ms", 9, ".1f"),
+        ("ollama/view", "ollama_calls_per_view", 11, ".2f"),
+        ("gemini/view", "gemini_calls_per_view", 11, ".2f"),
+        ("errors", "errors", 6, "d"),
+    ]
+    print("  ".join(f"{title:>{width}}" for title, _, width, _ in columns))
+    for result in results:
+        print("  ".join(f"{result[key]:>{width}{spec}}" for _, key, width, spec in columns))
+
+
+def main():
+    args = parse_args()
+    if args.scenario:
+        vocab_size, cache_state = args.scenario.split(":")
+        print(json.dumps(run_scenario(args, int(vocab_size), cache_state)))
+        return
+
+    caches = ["cold", "warm"] if args.caches == "both" else args.caches.split(",")
+    results = []
+    for vocab_size in (int(v) for v in args.vocab_sizes.split(",")):
+        for cache_state in caches:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--scenario", f"{vocab_size}:{cache_state}"],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            if args.json:
+                print(json.dumps(result), flush=True)
+    if not args.json:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    """Hands out one SQLite connection per thread for a database file.
+
+    Connections run in WAL mode so readers never block on a writer, and are
+    reopened after a fork so pre-forked workers never share an SQLite handle
+    with their parent.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,53 @@
+import json
+import os
+import time
+import uuid
+
+from db import ThreadLocalConnection
+
+EXERCISE_CACHE_FILE = os.getenv("EXERCISE_CACHE_FILE", "exercises.db")
+EXERCISE_CACHE_TTL_SECONDS = int(os.getenv("EXERCISE_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+
+class ExerciseCache:
+    """Served exercises by id, so a submitted answer finds its exercise again.
+
+    The page only posts back exercise ids; the sentence, question, token
+    translations and reference answer are read from here instead of being
+    re-translated. Entries live in SQLite shared by all workers and expire
+    after ``ttl`` seconds.
+    """
+
+    def __init__(self, path=EXERCISE_CACHE_FILE, ttl=EXERCISE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._connect = ThreadLocalConnection(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS exercises (id TEXT PRIMARY KEY, exercise TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS exercises_created_at ON exercises (created_at)")
+
+    def put_many(self, exercises):
+        """Stores exercises, setting a new ``id`` on each one."""
+        now = time.time()
+        for exercise in exercises:
+            exercise["id"] = uuid.uuid4().hex
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO exercises (id, exercise, created_at) VALUES (?, ?, ?)",
+                [(e["id"], json.dumps(e, ensure_ascii=False), now) for e in exercises],
+            )
+            conn.execute("DELETE FROM exercises WHERE created_at < ?", (now - self.ttl,))
+        return exercises
+
+    def get_many(self, ids):
+        """Returns {id: exercise} for the ids that are stored and not expired."""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        rows = self._connect().execute(
+            f"SELECT id, exercise FROM exercises WHERE id IN ({','.join('?' * len(ids))}) AND created_at >= ?",
+            (*ids, time.time() - self.ttl),
+        ).fetchall()
+        return {id_: json.loads(exercise) for id_, exercise in rows}
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+
+EXERCISE_POOL_SIZE = int(os.getenv("EXERCISE_POOL_SIZE", "8"))
+EXERCISE_POOL_WORKERS = int(os.getenv("EXERCISE_POOL_WORKERS", "2"))
+
+# Delay before a worker retries after the producer failed, doubled per
+# consecutive failure up to the maximum.
+RETRY_DELAY_SECONDS = 1
+MAX_RETRY_DELAY_SECONDS = 60
+
+
+class ExercisePool:
+    """Bounded queue of ready-to-serve practice exercises.
+
+    Background workers call ``producer(taken)`` to build fully translated
+    exercises, where ``taken`` is the set of words the queued exercises
+    already practise, so each new one can cover the words due next; each
+    exercise lists its words under ``"words"``. Up to ``size`` are kept
+    ready. ``pop(due)`` hands out, without waiting, the queued exercise
+    sharing the most words with the words due now; callers fall back to
+    building exercises inline when it returns None. Queued exercises are
+    kept until served, except that one sharing no due word makes room when
+    the queue is full.
+    """
+
+    def __init__(self, producer, size=EXERCISE_POOL_SIZE, workers=EXERCISE_POOL_WORKERS):
+        self.producer = producer
+        self.size = size
+        self.workers = workers
+        self._ready = []
+        self._in_progress = 0
+        self._cond = threading.Condition()
+        self._pid = None
+        self._closed = False
+
+    def _ensure_workers(self):
+        # Threads do not survive a fork, so each worker process starts its own.
+        if self._pid == os.getpid() or self.workers <= 0 or self._closed:
+            return
+        self._pid = os.getpid()
+        for i in range(self.workers):
+            threading.Thread(target=self._run, name=f"exercise-pool-{i}", daemon=True).start()
+
+    def close(self):
+        """Stops the workers once their current exercise is done."""
+        with self._cond:
+            self._closed = True
+            self._ready.clear()
+            self._cond.notify_all()
+
+    def pop(self, due):
+        """Returns the ready exercise that best covers the ``due`` words, or None if none does."""
+        due = set(due)
+        with self._cond:
+            self._ensure_workers()
+            best, overlap = None, 0
+            for i, exercise in enumerate(self._ready):
+                shared = len(due.intersection(exercise.get("words", ())))
+                if shared > overlap:
+                    best, overlap = i, shared
+            if best is not None:
+                exercise = self._ready.pop(best)
+            else:
+                exercise = None
+                if len(self._ready) >= self.size:
+                    self._ready.pop(0)
+            self._cond.notify()
+            return exercise
+
+    def _wants_more(self):
+        return len(self._ready) + self._in_progress < self.size
+
+    def _run(self):
+        delay = RETRY_DELAY_SECONDS
+        while True:
+            with self._cond:
+                while not self._wants_more() and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                taken = {word for exercise in self._ready for word in exercise.get("words", ())}
+                self._in_progress += 1
+
+            exercises = []
+            try:
+                exercises = self.producer(taken)
+            except Exception as e:
+                print(f"Exercise pre-generation failed: {e}")
+            finally:
+                with self._cond:
+                    self._in_progress -= 1
+                    if not self._closed:
+                        self._ready.extend(exercises[:max(self.size - len(self._ready), 0)])
+
+            if not exercises:
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+            else:
+                delay = RETRY_DELAY_SECONDS
@@ -0,0 +1,113 @@
+import os
+import zlib
+
+import numpy as np
+
+from arabic_text import normalize, tokenize
+
+NGRAM_SIZES = (2, 3)
+# Hashed feature space for character n-grams and tokens.
+FEATURE_DIM = 4096
+# Share of the score from character n-grams; the rest is token overlap.
+CHAR_WEIGHT = float(os.getenv("GRADING_CHAR_WEIGHT", "0.5"))
+# Pairs scored per array pass, bounding the feature matrices to a few MB.
+CHUNK_SIZE = 512
+
+CORRECT_SCORE = float(os.getenv("GRADING_CORRECT_SCORE", "0.7"))
+PARTIAL_SCORE = float(os.getenv("GRADING_PARTIAL_SCORE", "0.4"))
+
+_HASH_MULTIPLIER = np.uint64(1_000_003)
+
+
+def _char_ngrams(texts, n):
+    """Returns a (len(texts), FEATURE_DIM) matrix of hashed character n-gram counts.
+
+    All texts are hashed in one pass over their concatenated code points;
+    n-grams spanning two texts are masked out.
+    """
+    counts = np.zeros((len(texts), FEATURE_DIM), dtype=np.float32)
+    padded = [f" {text} " for text in texts]
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < n:
+        return counts
+    rows = np.repeat(np.arange(len(texts)), [len(p) for p in padded])
+    width = len(codes) - n + 1
+    hashes = np.zeros(width, dtype=np.uint64)
+    for offset in range(n):
+        hashes = hashes * _HASH_MULTIPLIER + codes[offset:offset + width]
+    valid = rows[:width] == rows[n - 1:]
+    np.add.at(counts, (rows[:width][valid], (hashes[valid] % FEATURE_DIM).astype(np.intp)), 1)
+    return counts
+
+
+def _token_sets(texts):
+    """Returns a (len(texts), FEATURE_DIM) 0/1 matrix of hashed lookup keys."""
+    present = np.zeros((len(texts), FEATURE_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            if token.key:
+                present[row, zlib.crc32(token.key.encode("utf-8")) % FEATURE_DIM] = 1
+    return present
+
+
+def _cosine(a, b):
+    dot = (a * b).sum(axis=1)
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    return np.divide(dot, norms, out=np.zeros_like(dot), where=norms > 0)
+
+
+def _overlap(a, b):
+    """Token F1: shared keys over the average number of keys."""
+    shared = np.minimum(a, b).sum(axis=1)
+    total = a.sum(axis=1) + b.sum(axis=1)
+    return np.divide(2 * shared, total, out=np.zeros_like(shared), where=total > 0)
+
+
+def similarity(answers, references):
+    """Scores each answer against its reference answer, from 0 to 1.
+
+    Both sides are normalized (see arabic_text.normalize) and compared by
+    cosine similarity of character 2- and 3-gram counts, which forgives
+    spelling slips and clitics, and by overlap of their lookup keys. All
+    pairs are scored together with array operations, CHUNK_SIZE at a time,
+    so a large batch costs a handful of passes rather than one per answer.
+    """
+    if len(answers) != len(references):
+        raise ValueError("answers and references must have the same length")
+    scores = [np.zeros(0, dtype=np.float32)]
+    for start in range(0, len(answers), CHUNK_SIZE):
+        scores.append(_similarity(answers[start:start + CHUNK_SIZE], references[start:start + CHUNK_SIZE]))
+    return np.concatenate(scores)
+
+
+def _similarity(answers, references):
+    count = len(answers)
+    normalized = [normalize(text) for text in list(answers) + list(references)]
+    char_scores = np.mean([
+        _cosine(grams[:count], grams[count:])
+        for grams in (_char_ngrams(normalized, n) for n in NGRAM_SIZES)
+    ], axis=0)
+    tokens = _token_sets(normalized)
+    token_scores = _overlap(tokens[:count], tokens[count:])
+    return CHAR_WEIGHT * char_scores + (1 - CHAR_WEIGHT) * token_scores
+
+
+def grade(answers, references):
+    """Returns a (score, verdict) pair per answer: "correct", "partial", "wrong" or "ungraded".
+
+    Answers without a reference answer are "ungraded"; empty answers are "wrong".
+    """
+    scores = similarity(answers, [reference or "" for reference in references])
+    results = []
+    for answer, reference, score in zip(answers, references, scores.tolist()):
+        if not reference:
+            results.append((None, "ungraded"))
+        elif not answer.strip():
+            results.append((0.0, "wrong"))
+        elif score >= CORRECT_SCORE:
+            results.append((score, "correct"))
+        elif score >= PARTIAL_SCORE:
+            results.append((score, "partial"))
+        else:
+            results.append((score, "wrong"))
+    return results
@@ -0,0 +1,142 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+
+from arabic_text import SPLIT_CLITICS, lookup_key
+
+LEXICON_FILE = os.getenv("LEXICON_FILE", "lexicon.idx")
+
+# File layout (native byte order):
+#   MAGIC, entry count (uint32), flags (uint32),
+#   key offsets (count + 1 uint32), value offsets (count + 1 uint32),
+#   UTF-8 keys concatenated in sorted byte order, UTF-8 values in the same order.
+MAGIC = b"LEX2"
+HEADER_SIZE = 12
+# Flag bit set when the keys were built with clitic splitting on.
+FLAG_SPLIT_CLITICS = 1
+
+
+def read_source(path):
+    """Yields (word, translation) pairs from a TSV file or a JSON object file."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).items()
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            word, sep, translation = line.rstrip("\n").partition("\t")
+            if sep:
+                yield word, translation
+
+
+def build_lexicon(source_path, index_path=LEXICON_FILE, split_clitics=SPLIT_CLITICS):
+    """Builds a lexicon index from a TSV or JSON dictionary. Returns the entry count.
+
+    Words are stored under their arabic_text.lookup_key; the first translation
+    seen for a key wins. The header records whether clitics were split, so
+    the index is only used with matching keys.
+    """
+    entries = {}
+    for word, translation in read_source(source_path):
+        key, translation = lookup_key(word.strip(), split_clitics).encode("utf-8"), translation.strip()
+        if key and translation and key not in entries:
+            entries[key] = translation.encode("utf-8")
+
+    keys = sorted(entries)
+    key_offsets, value_offsets = array("I", [0]), array("I", [0])
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(entries[key]))
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(array("I", [len(keys), FLAG_SPLIT_CLITICS if split_clitics else 0]).tobytes())
+        f.write(key_offsets.tobytes())
+        f.write(value_offsets.tobytes())
+        f.write(b"".join(keys))
+        f.write(b"".join(entries[key] for key in keys))
+    os.replace(tmp_path, index_path)
+    return len(keys)
+
+
+class Lexicon:
+    """Read-only Arabic -> English dictionary backed by a memory-mapped index.
+
+    Opening the index maps the file without reading it, so startup is instant
+    and only the pages touched by lookups become resident. Lookups binary
+    search the sorted keys and take a few microseconds. A missing index file
+    gives an empty lexicon; an index built with a different ``split_clitics``
+    setting is rejected, since its keys would not match.
+    """
+
+    def __init__(self, path=LEXICON_FILE, split_clitics=SPLIT_CLITICS):
+        self.path = path
+        self._count = 0
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"{path} is not a lexicon index in the current format; rebuild it")
+
+        view = memoryview(self._mm)
+        count, flags = view[4:HEADER_SIZE].cast("I")
+        if bool(flags & FLAG_SPLIT_CLITICS) != split_clitics:
+            raise ValueError(
+                f"{path} was built with SPLIT_CLITICS={int(not split_clitics)}; "
+                f"rebuild it with SPLIT_CLITICS={int(split_clitics)}"
+            )
+        self._count = count
+        size = 4 * (self._count + 1)
+        self._key_offsets = view[HEADER_SIZE:HEADER_SIZE + size].cast("I")
+        self._value_offsets = view[HEADER_SIZE + size:HEADER_SIZE + 2 * size].cast("I")
+        self._keys_start = HEADER_SIZE + 2 * size
+        self._values_start = self._keys_start + self._key_offsets[self._count]
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, i):
+        return self._mm[self._keys_start + self._key_offsets[i]:self._keys_start + self._key_offsets[i + 1]]
+
+    def get(self, key):
+        """Returns the translation for a lookup key, or None."""
+        target = key.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == target:
+            start = self._values_start + self._value_offsets[lo]
+            end = self._values_start + self._value_offsets[lo + 1]
+            return self._mm[start:end].decode("utf-8")
+        return None
+
+    def get_many(self, keys):
+        """Returns a dict of the translations found for the given lookup keys."""
+        if not self._count:
+            return {}
+        found = {}
+        for key in keys:
+            translation = self.get(key)
+            if translation is not None:
+                found[key] = translation
+        return found
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "build":
+        index_path = sys.argv[3] if len(sys.argv) > 3 else LEXICON_FILE
+        print(f"Indexed {build_lexicon(sys.argv[2], index_path)} entries into {index_path}.")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "lookup":
+        lexicon = Lexicon()
+        for word in sys.argv[2:]:
+            print(f"{word}\t{lexicon.get(lookup_key(word))}")
+    else:
+        sys.exit("usage: python lexicon.py build SOURCE.tsv|SOURCE.json [INDEX] | lookup WORD...")
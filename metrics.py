@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from flask import Response, g, has_request_context
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+SPAN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_DISABLED_SPAN = nullcontext()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """Stage timings and counters for the hot paths, exported as Prometheus text.
+
+    ``span(stage)`` times a block into the ``stage_duration_seconds``
+    histogram and, with Server-Timing on, into the current request's
+    ``Server-Timing`` header. ``inc(name, **labels)`` bumps a counter. When
+    both metrics and Server-Timing are off, spans are a shared no-op context
+    manager and ``inc`` returns at once. Values are per process.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, server_timing=SERVER_TIMING):
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self._counters = defaultdict(float)
+        self._span_counts = defaultdict(lambda: [0] * (len(SPAN_BUCKETS) + 1))
+        self._span_sums = defaultdict(float)
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Adds the ``/metrics`` endpoint and the Server-Timing header to an app."""
+        if self.enabled:
+            app.add_url_rule("/metrics", "metrics", self.metrics_view)
+        if self.server_timing:
+            app.after_request(self._add_server_timing)
+
+    def add_collector(self, collect):
+        """Registers a callable returning {counter name: value} read at scrape time."""
+        self._collectors.append(collect)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def span(self, stage):
+        if not (self.enabled or self.server_timing):
+            return _DISABLED_SPAN
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.enabled:
+                self._observe(stage, elapsed)
+            if self.server_timing and has_request_context():
+                timings = g.setdefault("stage_timings", {})
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+
+    def _observe(self, stage, elapsed):
+        bucket = next((i for i, bound in enumerate(SPAN_BUCKETS) if elapsed <= bound), len(SPAN_BUCKETS))
+        with self._lock:
+            self._span_counts[stage][bucket] += 1
+            self._span_sums[stage] += elapsed
+
+    def _add_server_timing(self, response):
+        timings = g.get("stage_timings")
+        if timings:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings.items()
+            )
+        return response
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            span_counts = {stage: list(counts) for stage, counts in self._span_counts.items()}
+            span_sums = dict(self._span_sums)
+        for collect in self._collectors:
+            for name, value in collect().items():
+                counters[(name, ())] = value
+
+        by_name = defaultdict(list)
+        for (name, labels), value in counters.items():
+            by_name[name].append((labels, value))
+        for name in sorted(by_name):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(by_name[name]):
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        if span_counts:
+            lines.append("# TYPE stage_duration_seconds histogram")
+        for stage in sorted(span_counts):
+            cumulative = 0
+            for bound, count in zip(SPAN_BUCKETS + ("+Inf",), span_counts[stage]):
+                cumulative += count
+                lines.append(f'stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'stage_duration_seconds_sum{{stage="{stage}"}} {span_sums[stage]:.6f}')
+            lines.append(f'stage_duration_seconds_count{{stage="{stage}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
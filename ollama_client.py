@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "3.05"))
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "60"))
+OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "2"))
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OllamaError(Exception):
+    """Raised when the Ollama server cannot produce a completion."""
+
+
+class OllamaClient:
+    """Shared client for Ollama's ``/api/generate`` endpoint.
+
+    Keeps a pool of keep-alive connections, applies connect/read timeouts,
+    retries transient failures with jittered exponential backoff and caps the
+    number of generations running on the local model at ``max_concurrency``.
+    Views call :meth:`generate`, or :meth:`stream` to read the completion as
+    it is produced; asyncio code awaits :meth:`agenerate`, which goes through
+    the same pool and concurrency limit.
+    """
+
+    def __init__(
+        self,
+        base_url=OLLAMA_URL,
+        model=OLLAMA_MODEL,
+        connect_timeout=OLLAMA_CONNECT_TIMEOUT,
+        read_timeout=OLLAMA_READ_TIMEOUT,
+        max_retries=OLLAMA_MAX_RETRIES,
+        max_concurrency=OLLAMA_MAX_CONCURRENCY,
+        backoff=0.5,
+    ):
+        self.url = base_url.rstrip("/") + "/api/generate"
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_concurrency, 10))
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _post(self, payload):
+        with self._slots:
+            response = self._session.post(self.url, json=payload, timeout=self.timeout)
+        if response.status_code in RETRY_STATUS_CODES:
+            raise requests.HTTPError(f"{response.status_code} from Ollama", response=response)
+        response.raise_for_status()
+        return response.json()
+
+    def generate(self, prompt, **fields):
+        """Returns the model's full completion for a prompt.
+
+        Extra keyword arguments (``format``, ``options``...) are passed through
+        in the request body. Raises OllamaError once retries are exhausted.
+        """
+        payload = {"model": self.model, "prompt": prompt, "stream": False, **fields}
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._post(payload)["response"].strip()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = getattr(e.response, "status_code", None)
+                retryable = status is None or status in RETRY_STATUS_CODES
+                if not retryable or attempt == self.max_retries:
+                    raise OllamaError(f"Ollama request failed: {e}") from e
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            except requests.RequestException as e:
+                raise OllamaError(f"Ollama request failed: {e}") from e
+            except (ValueError, KeyError) as e:
+                raise OllamaError(f"Unexpected response from Ollama: {e}") from e
+
+    def _open_stream(self, payload):
+        """POSTs a streaming request with retries; returns the response holding a slot.
+
+        The slot is released whenever no response is returned, whatever the error.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._slots.acquire()
+            try:
+                try:
+                    response = self._session.post(self.url, json=payload, timeout=self.timeout, stream=True)
+                    if response.status_code in RETRY_STATUS_CODES:
+                        response.close()
+                        raise requests.HTTPError(f"{response.status_code} from Ollama", response=response)
+                    response.raise_for_status()
+                    return response
+                except BaseException:
+                    self._slots.release()
+                    raise
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = getattr(e.response, "status_code", None)
+                retryable = status is None or status in RETRY_STATUS_CODES
+                if not retryable or attempt == self.max_retries:
+                    raise OllamaError(f"Ollama request failed: {e}") from e
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            except requests.RequestException as e:
+                raise OllamaError(f"Ollama request failed: {e}") from e
+
+    def stream(self, prompt, **fields):
+        """Yields the model's completion for a prompt in chunks as it is generated.
+
+        Failures before the response starts are retried like :meth:`generate`.
+        Closing the generator closes the connection, which makes Ollama stop
+        generating, and frees the concurrency slot.
+        """
+        payload = {"model": self.model, "prompt": prompt, "stream": True, **fields}
+        response = self._open_stream(payload)
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise OllamaError(f"Ollama generation failed: {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+        except (requests.RequestException, ValueError) as e:
+            raise OllamaError(f"Ollama stream failed: {e}") from e
+        finally:
+            response.close()
+            self._slots.release()
+
+    async def agenerate(self, prompt, **fields):
+        """Async variant of :meth:`generate` that runs on a worker thread."""
+        return await asyncio.to_thread(self.generate, prompt, **fields)
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,177 @@
+"""Per-user data in Redis, for running the app on several nodes.
+
+Set USER_DATA_URL (e.g. redis://redis:6379/0) and the same SECRET_KEY on
+every node: vocabularies, review schedules and served exercises then live
+in that Redis server instead of local SQLite files, so any node can serve
+any user without sticky sessions. Translations, the lexicon and generated
+responses stay in each node's local caches. Needs the ``redis`` package.
+"""
+import json
+import os
+import threading
+import uuid
+
+from word_store import WordStore
+
+USER_DATA_URL = os.getenv("USER_DATA_URL", "")
+USER_DATA_PREFIX = os.getenv("USER_DATA_PREFIX", "arabic")
+
+# Adds words that are not in the set yet, in order, and bumps the version.
+# With a guard key as KEYS[4], does nothing unless it can set that key first.
+_ADD_WORDS = """
+if KEYS[4] ~= '' and not redis.call('SET', KEYS[4], 1, 'NX') then
+    return {}
+end
+local added = {}
+for _, word in ipairs(ARGV) do
+    if redis.call('SADD', KEYS[2], word) == 1 then
+        redis.call('RPUSH', KEYS[1], word)
+        table.insert(added, word)
+    end
+end
+if #added > 0 then
+    redis.call('INCR', KEYS[3])
+end
+return added
+"""
+
+# Saves review rows (ARGV: word, json [due, interval, ease], ...) under the
+# next revision, which becomes each word's score in the revisions set.
+_SAVE_REVIEWS = """
+local rev = redis.call('INCR', KEYS[3])
+for i = 1, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    redis.call('ZADD', KEYS[2], rev, ARGV[i])
+end
+return rev
+"""
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def redis_client(url=USER_DATA_URL):
+    """Returns the process's Redis client for ``url``, created on first use."""
+    with _clients_lock:
+        if url not in _clients:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("USER_DATA_URL is set but the redis package is not installed") from None
+            _clients[url] = redis.Redis.from_url(url, decode_responses=True)
+        return _clients[url]
+
+
+def _key(*parts):
+    return ":".join((USER_DATA_PREFIX,) + parts)
+
+
+def redis_user_exists(user_id, client=None):
+    """Returns whether the user has a vocabulary in Redis."""
+    return bool((client or redis_client()).sismember(_key("users"), user_id))
+
+
+def redis_user_ids(client=None):
+    """Yields the ids of all users with a vocabulary in Redis."""
+    yield from (client or redis_client()).sscan_iter(_key("users"))
+
+
+class RedisWordStore(WordStore):
+    """WordStore for one user, kept in Redis.
+
+    The words are a list plus a set for uniqueness, the version a counter,
+    and the review schedule a hash of rows plus a sorted set of their
+    revisions. Writes run as Lua scripts, so they are atomic across nodes.
+    """
+
+    def __init__(self, user_id, seed_json=None, client=None):
+        self.path = f"{USER_DATA_URL}#{user_id}"
+        self._redis = client or redis_client()
+        self._words_key = _key("words", user_id, "list")
+        self._set_key = _key("words", user_id, "set")
+        self._version_key = _key("words", user_id, "version")
+        self._seeded_key = _key("words", user_id, "seeded")
+        self._reviews_key = _key("words", user_id, "reviews")
+        self._revs_key = _key("words", user_id, "revs")
+        self._rev_key = _key("words", user_id, "rev")
+        self._add = self._redis.register_script(_ADD_WORDS)
+        self._save = self._redis.register_script(_SAVE_REVIEWS)
+        self._lock = threading.Lock()
+        self._words = []
+        self._index = set()
+        self._version = None
+        if seed_json:
+            self._seed(seed_json)
+        self._redis.sadd(_key("users"), user_id)
+
+    def _seed(self, json_path):
+        words = []
+        if os.path.exists(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                words = json.load(f)
+        self._add(keys=self._keys(self._seeded_key), args=[w for w in dict.fromkeys(words) if w])
+
+    def _keys(self, guard=""):
+        return [self._words_key, self._set_key, self._version_key, guard]
+
+    def version(self):
+        return int(self._redis.get(self._version_key) or 0)
+
+    def _load(self):
+        return self._redis.lrange(self._words_key, 0, -1)
+
+    def add_many(self, words):
+        words = [w for w in dict.fromkeys(words) if w]
+        if not words:
+            return []
+        return list(self._add(keys=self._keys(), args=words))
+
+    def replace(self, words):
+        words = [w for w in dict.fromkeys(words) if w]
+        with self._redis.pipeline() as pipe:
+            pipe.delete(self._words_key, self._set_key)
+            if words:
+                pipe.rpush(self._words_key, *words)
+                pipe.sadd(self._set_key, *words)
+            pipe.incr(self._version_key)
+            pipe.execute()
+
+    def reviews(self, since=0):
+        revs = self._redis.zrangebyscore(self._revs_key, f"({since}", "+inf", withscores=True)
+        if not revs:
+            return []
+        rows = self._redis.hmget(self._reviews_key, [word for word, _ in revs])
+        return [
+            (word, *json.loads(row), int(rev))
+            for (word, rev), row in zip(revs, rows)
+            if row is not None
+        ]
+
+    def save_reviews(self, updates):
+        args = []
+        for word, due, interval, ease in updates:
+            args += [word, json.dumps([due, interval, ease])]
+        return int(self._save(keys=[self._reviews_key, self._revs_key, self._rev_key], args=args))
+
+
+class RedisExerciseCache:
+    """ExerciseCache (see exercise_cache.py) kept in Redis, shared by all nodes."""
+
+    def __init__(self, ttl, client=None):
+        self.ttl = ttl
+        self._redis = client or redis_client()
+
+    def put_many(self, exercises):
+        with self._redis.pipeline() as pipe:
+            for exercise in exercises:
+                exercise["id"] = uuid.uuid4().hex
+                pipe.set(_key("exercise", exercise["id"]), json.dumps(exercise, ensure_ascii=False), ex=self.ttl)
+            pipe.execute()
+        return exercises
+
+    def get_many(self, ids):
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        values = self._redis.mget([_key("exercise", id_) for id_ in ids])
+        return {id_: json.loads(value) for id_, value in zip(ids, values) if value is not None}
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from db import ThreadLocalConnection
+
+RESPONSE_CACHE_FILE = os.getenv("RESPONSE_CACHE_FILE", "responses.db")
+RESPONSE_CACHE_VARIANTS = int(os.getenv("RESPONSE_CACHE_VARIANTS", "5"))
+RESPONSE_CACHE_MEMORY_KEYS = int(os.getenv("RESPONSE_CACHE_MEMORY_KEYS", "256"))
+RESPONSE_CACHE_DISK_KEYS = int(os.getenv("RESPONSE_CACHE_DISK_KEYS", "10000"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "0")) or None
+
+
+def response_key(model, prompt, params=None):
+    """Returns the content address of a generation request."""
+    payload = json.dumps([model, prompt, params or {}], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Stores up to ``variants`` generated responses per request key.
+
+    While a key has fewer than ``variants`` responses, ``get`` misses so the
+    caller generates a fresh one and ``add``s it; after that, ``get`` rotates
+    through the stored responses instead of calling the model again.
+
+    Recently used keys are kept in memory (LRU, ``memory_keys`` entries) in
+    front of an SQLite tier shared by all workers, which drops its least
+    recently used keys past ``disk_keys`` and expires entries after ``ttl``.
+    """
+
+    def __init__(
+        self,
+        path=RESPONSE_CACHE_FILE,
+        variants=RESPONSE_CACHE_VARIANTS,
+        memory_keys=RESPONSE_CACHE_MEMORY_KEYS,
+        disk_keys=RESPONSE_CACHE_DISK_KEYS,
+        ttl=RESPONSE_CACHE_TTL_SECONDS,
+    ):
+        self.variants = variants
+        self.memory_keys = memory_keys
+        self.disk_keys = disk_keys
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._next = {}
+        self._lock = threading.Lock()
+        self._connect = ThreadLocalConnection(path)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_key ON responses (key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def _load(self, key):
+        """Returns the stored variants for a key, reading through to disk."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        now = time.time()
+        conn = self._connect()
+        oldest = now - self.ttl if self.ttl is not None else 0
+        rows = conn.execute(
+            "SELECT response FROM responses WHERE key = ? AND created_at >= ? ORDER BY rowid",
+            (key, oldest),
+        ).fetchall()
+        variants = [r[0] for r in rows][:self.variants]
+        if variants:
+            with conn:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._remember(key, variants)
+        return variants
+
+    def _remember(self, key, variants):
+        with self._lock:
+            self._memory[key] = variants
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_keys:
+                evicted, _ = self._memory.popitem(last=False)
+                self._next.pop(evicted, None)
+
+    def get(self, key):
+        """Returns the next stored variant for a key, or None until it has enough."""
+        variants = self._load(key)
+        with self._lock:
+            if len(variants) < self.variants:
+                self.misses += 1
+                return None
+            self.hits += 1
+            index = self._next.get(key, 0) % len(variants)
+            self._next[key] = index + 1
+            return variants[index]
+
+    def add(self, key, response):
+        """Stores a newly generated response as another variant of a key."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+        with self._lock:
+            self._memory.pop(key, None)
+        self.evict()
+
+    def recent(self, limit):
+        """Returns up to ``limit`` most recently generated responses, newest first."""
+        rows = self._connect().execute(
+            "SELECT response FROM responses ORDER BY rowid DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def evict(self):
+        """Drops expired responses and the least recently used keys past ``disk_keys``."""
+        conn = self._connect()
+        with conn:
+            if self.ttl is not None:
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses GROUP BY key
+                    ORDER BY MAX(accessed_at) DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.disk_keys,),
+            )
+
+    def stats(self):
+        """Returns hit/miss counters for this process."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_keys": len(self._memory)}
@@ -0,0 +1,79 @@
+import re
+
+MARKER_PATTERN = re.compile(r'\*\*([A-Za-z ]+):\*\*')
+
+# Longest tail kept while no section is open, so a marker split across two
+# chunks is still found.
+MAX_MARKER_LENGTH = 40
+
+
+class SectionParser:
+    """Incrementally splits model output into ``**Field:**`` sections.
+
+    ``feed(chunk)`` returns the (field, text) sections the chunk completed;
+    a section ends at the first line break after its text or at the next
+    marker. ``close()`` flushes the section still open at the end of the
+    stream. Field names are lower-cased and only ``fields`` are reported;
+    the first text seen for each is kept in ``sections``. Consumed input is
+    dropped, so each chunk costs time proportional to its own length plus
+    the open section.
+    """
+
+    def __init__(self, fields=("sentence", "question")):
+        self.fields = set(fields)
+        self.sections = {}
+        self._buffer = ""
+        self._pos = 0
+        self._field = None
+
+    @property
+    def done(self):
+        """True once every field has been captured."""
+        return self.fields <= self.sections.keys()
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        return self._scan(final=False)
+
+    def close(self):
+        return self._scan(final=True)
+
+    def _scan(self, final):
+        completed = []
+        buffer = self._buffer
+        while True:
+            marker = MARKER_PATTERN.search(buffer, self._pos)
+            if self._field is None:
+                if marker is None:
+                    self._pos = max(self._pos, len(buffer) - MAX_MARKER_LENGTH)
+                    break
+                self._field = marker.group(1).strip().lower()
+                self._pos = marker.end()
+                continue
+
+            end = marker.start() if marker else len(buffer)
+            start = self._pos
+            while start < end and buffer[start].isspace():
+                start += 1
+            newline = buffer.find("\n", start, end)
+            if newline != -1:
+                end = newline
+            elif marker is None and not final:
+                break
+
+            text = buffer[start:end].replace("**", "").strip()
+            if text and self._field in self.fields:
+                completed.append((self._field, text))
+                self.sections.setdefault(self._field, text)
+            self._field = None
+            self._pos = end
+
+        self._buffer = buffer[self._pos:]
+        self._pos = 0
+        return completed
+
+    @classmethod
+    def parse(cls, text, fields=("sentence", "question")):
+        """Returns every (field, text) section of a complete text, in order."""
+        parser = cls(fields)
+        return parser.feed(text) + parser.close()
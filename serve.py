@@ -0,0 +1,196 @@
+"""Production entry point for the web app.
+
+    python serve.py --bind 0.0.0.0:8000 --workers 2 --threads 128
+
+Requests spend nearly all of their time waiting on the generation and
+translation models, so each worker process runs many request threads: a
+blocked thread costs memory, not CPU, and one process serves hundreds of
+practice sessions waiting on model latency. Uses gunicorn's threaded
+workers when gunicorn is installed, otherwise werkzeug's threaded server
+in a single process, which refuses ``--workers`` above 1 and runs at most
+``--threads`` requests at once. SIGTERM and SIGINT stop accepting connections and let
+in-flight requests finish for up to ``--graceful-timeout`` seconds.
+Each process starts the cache warm-up job (see warmup.py).
+``python app.py`` still runs the debug server for development.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+SERVER_BIND = os.getenv("SERVER_BIND", "127.0.0.1:8000")
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(min(os.cpu_count() or 1, 4))))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "128"))
+# Generation can legitimately take a minute; only kill workers stuck well past that.
+SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "180"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default=SERVER_BIND, help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"worker processes (gunicorn only; default {SERVER_WORKERS})")
+    parser.add_argument("--threads", type=int, default=SERVER_THREADS, help="request threads per worker")
+    parser.add_argument("--timeout", type=int, default=SERVER_TIMEOUT, help="seconds before a silent worker is restarted")
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_TIMEOUT,
+                        help="seconds in-flight requests get to finish on shutdown")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "werkzeug"], default="auto")
+    return parser.parse_args(argv)
+
+
+def available_server(choice):
+    if choice != "auto":
+        return choice
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return "werkzeug"
+    return "gunicorn"
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            settings = {
+                "bind": args.bind,
+                "workers": args.workers or SERVER_WORKERS,
+                "worker_class": "gthread",
+                "threads": args.threads,
+                "timeout": args.timeout,
+                "graceful_timeout": args.graceful_timeout,
+                "keepalive": 5,
+                # Safe to share: SQLite connections, the exercise pool and the
+                # model clients are all created per process on first use.
+                "preload_app": True,
+                "post_fork": lambda server, worker: self.application.cache_warmer.start(),
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            import app
+            self.application = app
+            return app.app
+
+    # gunicorn already drains workers for graceful_timeout on SIGTERM.
+    Application().run()
+
+
+class InFlight:
+    """WSGI middleware counting requests whose responses are still being sent."""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _done(self):
+        with self._lock:
+            self.count -= 1
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.count += 1
+        try:
+            response = self.app(environ, start_response)
+        except BaseException:
+            self._done()
+            raise
+        return _ClosingIterator(response, self._done)
+
+
+class _ClosingIterator:
+    def __init__(self, response, on_close):
+        self._response = response
+        self._on_close = on_close
+
+    def __iter__(self):
+        return iter(self._response)
+
+    def close(self):
+        try:
+            if hasattr(self._response, "close"):
+                self._response.close()
+        finally:
+            self._on_close()
+
+
+def bounded_server_class():
+    from werkzeug.serving import ThreadedWSGIServer
+
+    class BoundedThreadedWSGIServer(ThreadedWSGIServer):
+        """werkzeug's thread-per-request server, with at most ``threads`` request threads.
+
+        Once all are busy, new connections wait in the listen backlog. The
+        wait for a free thread gives up when ``shutdown`` is called, so a
+        server full of long streams still stops on time.
+        """
+
+        def __init__(self, host, port, app, threads):
+            super().__init__(host, port, app)
+            self._slots = threading.BoundedSemaphore(threads)
+            self._stopping = threading.Event()
+
+        def shutdown(self):
+            self._stopping.set()
+            super().shutdown()
+
+        def process_request(self, request, client_address):
+            while not self._slots.acquire(timeout=0.1):
+                if self._stopping.is_set():
+                    self.shutdown_request(request)
+                    return
+            try:
+                super().process_request(request, client_address)
+            except BaseException:
+                self._slots.release()
+                raise
+
+        def process_request_thread(self, request, client_address):
+            try:
+                super().process_request_thread(request, client_address)
+            finally:
+                self._slots.release()
+
+    return BoundedThreadedWSGIServer
+
+
+def run_werkzeug(args):
+    if args.workers not in (None, 1):
+        sys.exit("--workers needs gunicorn; the werkzeug server runs a single process.")
+    from app import app, cache_warmer
+
+    cache_warmer.start()
+    host, _, port = args.bind.rpartition(":")
+    in_flight = InFlight(app)
+    server = bounded_server_class()(host or "127.0.0.1", int(port), in_flight, args.threads)
+
+    def handler(signum, frame):
+        print(f"Received signal {signum}, finishing in-flight requests...")
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, handler)
+    signal.signal(signal.SIGINT, handler)
+
+    print(f"Serving on http://{args.bind} with werkzeug (one process, up to {args.threads} request threads)")
+    server.serve_forever()
+    server.server_close()
+    deadline = time.monotonic() + args.graceful_timeout
+    while in_flight.count and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if in_flight.count:
+        print(f"Stopping with {in_flight.count} requests still running.")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = available_server(args.server)
+    {"gunicorn": run_gunicorn, "werkzeug": run_werkzeug}[server](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesces concurrent work on the same keys within a process.
+
+    ``claim`` splits keys into those the caller now owns and those another
+    thread is already working on. The owner must ``resolve`` (or ``abandon``)
+    every key it owns; other callers wait on the returned futures and get
+    the owner's result instead of repeating the work.
+
+    ``resolve`` and ``abandon`` take the owner's futures, so a late call
+    never ends a newer flight another thread has started on the same key:
+
+    >>> flights = SingleFlight()
+    >>> a, _ = flights.claim(["k"])
+    >>> flights.resolve(a, {"k": "book"})
+    >>> b, _ = flights.claim(["k"])
+    >>> _, c = flights.claim(["k"])
+    >>> flights.abandon(a, "error")
+    >>> flights.resolve(b, {"k": "book"})
+    >>> c["k"].result()
+    'book'
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def claim(self, keys):
+        """Returns (owned, waiting): dicts of key -> Future."""
+        owned, waiting = {}, {}
+        with self._lock:
+            for key in keys:
+                if key in self._flights:
+                    waiting[key] = self._flights[key]
+                else:
+                    owned[key] = self._flights[key] = Future()
+        return owned, waiting
+
+    def resolve(self, owned, results):
+        """Publishes results for keys in ``owned`` (as returned by ``claim``) and ends their flights."""
+        futures = []
+        with self._lock:
+            for key, value in results.items():
+                future = owned.get(key)
+                if future is None:
+                    continue
+                if self._flights.get(key) is future:
+                    del self._flights[key]
+                futures.append((future, value))
+        for future, value in futures:
+            if not future.done():
+                future.set_result(value)
+
+    def abandon(self, owned, default=None):
+        """Ends the flights in ``owned`` that are still open, handing waiters ``default``."""
+        self.resolve(owned, {key: default for key, future in owned.items() if not future.done()})
@@ -0,0 +1,41 @@
+function insertChar(char, targetId) {
+    const inputField = document.getElementById(targetId);
+    if (inputField) {
+        inputField.value += char;
+    }
+}
+function clearInput(targetId) {
+    const inputField = document.getElementById(targetId);
+    if (inputField) {
+        inputField.value = '';
+    }
+}
+
+var recognition;
+function startRecognition(targetId) {
+    const statusDiv = document.getElementById(targetId === 'new_word' ? 'speechStatus' : 'speechStatusPractice');
+    const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
+    if (!SpeechRecognition) {
+        alert("Speech Recognition not supported in this browser.");
+        if (statusDiv) statusDiv.textContent = "Speech Recognition not supported.";
+        return;
+    }
+
+    recognition = new SpeechRecognition();
+    recognition.lang = 'ar-SA';
+    recognition.interimResults = false;
+    recognition.maxAlternatives = 1;
+
+    recognition.onstart = () => { if (statusDiv) statusDiv.textContent = "🎙 Listening..."; };
+    recognition.onerror = (event) => { if (statusDiv) statusDiv.textContent = "❌ Error: " + event.error; };
+    recognition.onend = () => { if (statusDiv) statusDiv.textContent = "Stopped."; };
+    recognition.onresult = (event) => {
+        let transcript = event.results[0][0].transcript;
+        const inputField = document.getElementById(targetId);
+        if (inputField) {
+            inputField.value += transcript;
+        }
+        if (statusDiv) statusDiv.textContent = "✅ You said: " + transcript;
+    };
+    recognition.start();
+}
@@ -0,0 +1,54 @@
+// Fills the practice page from the /practice/events Server-Sent Events stream.
+(function () {
+    const eventsUrl = document.currentScript.dataset.eventsUrl;
+    const spansByKey = {};
+
+    function setTooltip(wordSpan, english) {
+        let tooltip = wordSpan.querySelector('.tooltip-text');
+        if (!tooltip) {
+            tooltip = document.createElement('span');
+            tooltip.className = 'tooltip-text';
+            wordSpan.appendChild(tooltip);
+        }
+        tooltip.textContent = english;
+    }
+
+    function renderTokens(displayId, inputId, data) {
+        const display = document.getElementById(displayId);
+        display.textContent = '';
+        for (const token of data.tokens) {
+            const wordSpan = document.createElement('span');
+            wordSpan.className = 'arabic-word-with-translation';
+            wordSpan.textContent = token.arabic;
+            if (token.english) {
+                setTooltip(wordSpan, token.english);
+            } else if (token.key) {
+                (spansByKey[token.key] = spansByKey[token.key] || []).push(wordSpan);
+            }
+            display.appendChild(wordSpan);
+            display.appendChild(document.createTextNode(' '));
+        }
+        document.getElementById(inputId).value = data.text;
+    }
+
+    const source = new EventSource(eventsUrl);
+    source.addEventListener('sentence', (event) => {
+        renderTokens('sentence-display-0', 'original_sentence-0', JSON.parse(event.data));
+    });
+    source.addEventListener('question', (event) => {
+        renderTokens('question-display-0', 'question-0', JSON.parse(event.data));
+    });
+    source.addEventListener('translations', (event) => {
+        const translations = JSON.parse(event.data);
+        for (const [key, english] of Object.entries(translations)) {
+            for (const wordSpan of spansByKey[key] || []) {
+                setTooltip(wordSpan, english);
+            }
+        }
+    });
+    source.addEventListener('exercise', (event) => {
+        document.getElementById('exercise_id-0').value = JSON.parse(event.data).id;
+    });
+    source.addEventListener('done', () => source.close());
+    source.onerror = () => source.close();
+})();
@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+
+from db import ThreadLocalConnection
+
+CACHE_FILE = os.getenv("TRANSLATION_CACHE_FILE", "translations.db")
+CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "100000"))
+CACHE_TTL_SECONDS = int(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", "0")) or None
+
+# Refreshing the LRU timestamp on every hit would turn each read into a write,
+# so a hit only touches the row when its timestamp is older than this.
+TOUCH_INTERVAL_SECONDS = 60
+EVICT_CHECK_EVERY = 256
+SQLITE_MAX_PARAMS = 500
+
+
+class TranslationCache:
+    """Arabic -> English translation cache shared by all workers through SQLite.
+
+    The database runs in WAL mode so readers never block on a writer. Entries
+    are evicted least-recently-used once the table grows past ``max_entries``
+    and expire after ``ttl`` seconds when a TTL is configured.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._connect = ThreadLocalConnection(path)
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    word TEXT PRIMARY KEY,
+                    translation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS translations_accessed_at ON translations (accessed_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translation_leases (word TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+
+    def _is_fresh(self, created_at, now):
+        return self.ttl is None or now - created_at < self.ttl
+
+    def _count(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, word):
+        """Returns the cached translation for a word, or None on a miss."""
+        return self.get_many([word]).get(word)
+
+    def get_many(self, words, record_stats=True):
+        """Returns a dict of the cached translations for the given words.
+
+        Pass ``record_stats=False`` for polling reads that should not count
+        towards the hit/miss counters.
+        """
+        words = list(dict.fromkeys(w for w in words if w))
+        if not words:
+            return {}
+
+        now = time.time()
+        conn = self._connect()
+        found = {}
+        stale = []
+        to_touch = []
+        for start in range(0, len(words), SQLITE_MAX_PARAMS):
+            chunk = words[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT word, translation, created_at, accessed_at FROM translations WHERE word IN ({placeholders})",
+                chunk,
+            )
+            for word, translation, created_at, accessed_at in rows:
+                if not self._is_fresh(created_at, now):
+                    stale.append(word)
+                    continue
+                found[word] = translation
+                if now - accessed_at > TOUCH_INTERVAL_SECONDS:
+                    to_touch.append(word)
+
+        if to_touch or stale:
+            with conn:
+                conn.executemany(
+                    "UPDATE translations SET accessed_at = ? WHERE word = ?",
+                    [(now, w) for w in to_touch],
+                )
+                conn.executemany("DELETE FROM translations WHERE word = ?", [(w,) for w in stale])
+
+        if record_stats:
+            self._count(len(found), len(words) - len(found))
+        return found
+
+    def set(self, word, translation):
+        """Stores a single translation."""
+        self.set_many({word: translation})
+
+    def set_many(self, items):
+        """Stores several translations in one transaction."""
+        now = time.time()
+        rows = [(w, t, now, now) for w, t in items.items() if w and t]
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations (word, translation, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self._maybe_evict(len(rows))
+
+    def seed(self, items):
+        """Adds translations without overwriting entries that already exist."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO translations (word, translation, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(w, t, now, now) for w, t in items.items()],
+            )
+
+    def claim(self, words, ttl):
+        """Leases words for translation across workers and returns those leased.
+
+        A word leased by another worker is skipped until that lease is
+        released or expires after ``ttl`` seconds.
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM translation_leases WHERE expires_at < ?", (now,))
+            return [
+                w for w in words
+                if conn.execute(
+                    "INSERT OR IGNORE INTO translation_leases (word, expires_at) VALUES (?, ?)",
+                    (w, now + ttl),
+                ).rowcount
+            ]
+
+    def release(self, words):
+        """Ends the leases taken by ``claim``."""
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM translation_leases WHERE word = ?", [(w,) for w in words])
+
+    def _maybe_evict(self, written):
+        with self._lock:
+            self._writes_since_evict += written
+            if self._writes_since_evict < EVICT_CHECK_EVERY:
+                return
+            self._writes_since_evict = 0
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then least-recently-used ones over the size bound."""
+        conn = self._connect()
+        with conn:
+            if self.ttl is not None:
+                conn.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl,))
+            (size,) = conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+            overflow = size - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM translations WHERE word IN "
+                    "(SELECT word FROM translations ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+
+    def stats(self):
+        """Returns hit/miss counters for this process and the shared entry count."""
+        (size,) = self._connect().execute("SELECT COUNT(*) FROM translations").fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": size,
+        }
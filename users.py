@@ -0,0 +1,118 @@
+import os
+import re
+import secrets
+import threading
+import uuid
+from collections import OrderedDict
+
+from flask import session
+
+from redis_store import USER_DATA_URL, RedisWordStore, redis_user_exists, redis_user_ids
+from word_store import WordStore, file_lock, user_ids, user_words_path
+
+SECRET_KEY_FILE = os.getenv("SECRET_KEY_FILE", ".secret_key")
+MAX_OPEN_USERS = int(os.getenv("MAX_OPEN_USERS", "256"))
+
+USER_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def secret_key(path=SECRET_KEY_FILE):
+    """Returns SECRET_KEY from the environment, else a key generated once into ``path``.
+
+    All workers must sign sessions with the same key. The file only covers
+    the workers of one host, so SECRET_KEY is required once user data is
+    shared between nodes through USER_DATA_URL.
+    """
+    if os.getenv("SECRET_KEY"):
+        return os.getenv("SECRET_KEY")
+    if USER_DATA_URL:
+        raise RuntimeError("SECRET_KEY must be set, to the same value on every node, when USER_DATA_URL is set")
+    with file_lock(path):
+        if not os.path.exists(path):
+            with open(path, "w") as f:
+                f.write(secrets.token_hex(32))
+        with open(path) as f:
+            return f.read().strip()
+
+
+def current_user_id(create=True):
+    """Returns the session's user id, assigning a new random one if ``create`` is set.
+
+    The id lives in the signed session cookie, so any worker, and with
+    USER_DATA_URL any node, can serve the user without sticky sessions.
+    Without ``create``, a
+    visitor who has no id yet gets None and no cookie.
+    """
+    user_id = session.get("user_id")
+    if not isinstance(user_id, str) or not USER_ID_PATTERN.fullmatch(user_id):
+        if not create:
+            return None
+        user_id = session["user_id"] = uuid.uuid4().hex
+        session.permanent = True
+    return user_id
+
+
+def open_user_store(user_id, seed_json=None):
+    """Returns a user's word store: in Redis when USER_DATA_URL is set, else a local SQLite file."""
+    if USER_DATA_URL:
+        return RedisWordStore(user_id, seed_json=seed_json)
+    return WordStore(user_words_path(user_id), seed_json=seed_json)
+
+
+def user_store_exists(user_id):
+    """Returns whether the user has saved a store yet."""
+    if USER_DATA_URL:
+        return redis_user_exists(user_id)
+    return os.path.exists(user_words_path(user_id))
+
+
+def stored_user_ids():
+    """Yields the ids of all users with a store."""
+    yield from redis_user_ids() if USER_DATA_URL else user_ids()
+
+
+class UserSpace:
+    """One user's vocabulary store, review schedule and exercise pool."""
+
+    def __init__(self, user_id, store, scheduler, pool):
+        self.user_id = user_id
+        self.store = store
+        self.scheduler = scheduler
+        self.pool = pool
+
+    def close(self):
+        self.pool.close()
+
+
+class UserSpaces:
+    """Keeps the ``max_users`` most recently used users' spaces open.
+
+    ``open_space(user_id)`` builds a space on first use; the least recently
+    used one is closed when the limit is reached and reopened from its
+    store if the user comes back.
+    """
+
+    def __init__(self, open_space, max_users=MAX_OPEN_USERS):
+        self.open_space = open_space
+        self.max_users = max_users
+        self._spaces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            space = self._spaces.get(user_id)
+            if space is not None:
+                self._spaces.move_to_end(user_id)
+                return space
+            space = self._spaces[user_id] = self.open_space(user_id)
+            evicted = []
+            while len(self._spaces) > self.max_users:
+                evicted.append(self._spaces.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return space
+
+    def values(self):
+        """Returns the currently open spaces."""
+        with self._lock:
+            return list(self._spaces.values())
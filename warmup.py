@@ -0,0 +1,119 @@
+"""Pre-translates the users' vocabularies and recently generated exercises.
+
+    python warmup.py [--workers 4] [--recent 200]
+
+Runs one warm-up pass over every user's words against the app's caches and
+exits. The app runs the same job in the background, over the users active
+in that process, at start-up, every WARMUP_INTERVAL seconds (if set) and
+after words are added.
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from arabic_text import tokenize_many
+
+WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "4"))
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "40"))
+# Seconds between background passes; 0 runs only at start-up and when woken.
+WARMUP_INTERVAL_SECONDS = float(os.getenv("WARMUP_INTERVAL", "0"))
+WARMUP_RECENT_RESPONSES = int(os.getenv("WARMUP_RECENT_RESPONSES", "200"))
+
+
+class CacheWarmer:
+    """Translates tokens ahead of time so requests find them cached.
+
+    ``sources`` are callables returning texts (single words or whole
+    sentences). A pass tokenizes them, drops the lookup keys ``lookup``
+    already answers and sends the rest, with the words as written, to
+    ``translate(keys, surfaces)`` in batches of
+    ``batch_size`` on at most ``workers`` threads, reporting progress after
+    each batch. ``start`` runs passes on a daemon thread: once at start-up,
+    then every ``interval`` seconds and whenever ``wake`` is called.
+    """
+
+    def __init__(self, sources, lookup, translate, workers=WARMUP_WORKERS,
+                 batch_size=WARMUP_BATCH_SIZE, interval=WARMUP_INTERVAL_SECONDS):
+        self.sources = sources
+        self.lookup = lookup
+        self.translate = translate
+        self.workers = workers
+        self.batch_size = batch_size
+        self.interval = interval
+        self.last_run = None
+        self._wake = threading.Event()
+        self._pid = None
+
+    def missing_keys(self):
+        """Returns {lookup key: word as first written} for the keys that have no translation yet."""
+        texts = [text for source in self.sources for text in source()]
+        surfaces = {}
+        for tokens in tokenize_many(texts):
+            for t in tokens:
+                if t.key:
+                    surfaces.setdefault(t.key, t.text)
+        found = self.lookup(list(surfaces))
+        return {k: w for k, w in surfaces.items() if k not in found}
+
+    def run(self, report=print):
+        """Runs one pass. Returns the number of keys sent for translation."""
+        started = time.perf_counter()
+        surfaces = self.missing_keys()
+        keys = list(surfaces)
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        done = 0
+        if batches:
+            report(f"Warm-up: translating {len(keys)} keys in {len(batches)} batches")
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as executor:
+                futures = {executor.submit(self.translate, batch, surfaces): batch for batch in batches}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        report(f"Warm-up batch failed: {e}")
+                    done += len(futures[future])
+                    report(f"Warm-up: {done}/{len(keys)} keys ({time.perf_counter() - started:.1f}s)")
+        self.last_run = {"keys": len(keys), "finished_at": time.time(), "seconds": time.perf_counter() - started}
+        return len(keys)
+
+    def start(self):
+        """Starts the background thread in this process if it is not running yet."""
+        # Threads do not survive a fork, so each worker process starts its own.
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._loop, name="cache-warmer", daemon=True).start()
+
+    def wake(self):
+        """Asks the background thread for a pass soon, starting it if needed."""
+        self._wake.set()
+        self.start()
+
+    def _loop(self):
+        while True:
+            self._wake.clear()
+            try:
+                self.run()
+            except Exception as e:
+                print(f"Cache warm-up failed: {e}")
+            self._wake.wait(self.interval or None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=WARMUP_WORKERS, help="concurrent translation batches")
+    parser.add_argument("--recent", type=int, default=WARMUP_RECENT_RESPONSES,
+                        help="recently generated responses to scan")
+    args = parser.parse_args(argv)
+
+    import app
+
+    app.cache_warmer.sources = [app.all_user_words, lambda: app.recent_exercise_texts(args.recent)]
+    app.cache_warmer.workers = args.workers
+    print(f"Sent {app.cache_warmer.run()} keys for translation.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import heapq
+import os
+import threading
+import time
+
+# Seconds until a word comes up again after its first review; each later
+# successful review multiplies the interval by the word's ease.
+FIRST_INTERVAL_SECONDS = float(os.getenv("REVIEW_FIRST_INTERVAL", "600"))
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+
+class WordScheduler:
+    """Spaced-repetition schedule over a WordStore's vocabulary.
+
+    Every word has a due time, an interval and an ease factor, saved with
+    the words through ``store.reviews`` / ``store.save_reviews``. A min-heap ordered by due time
+    picks the ``k`` most overdue words in O(k log n); words never reviewed
+    are due first, in insertion order. Picking words does not change the
+    schedule; callers ``defer`` the words of an exercise they serve and
+    ``review`` them once the answer is graded. Changes are persisted with a
+    revision number so other workers apply just the changed rows instead
+    of reloading the schedule; the heap is rebuilt only when the vocabulary
+    changes. Outdated heap entries are skipped when popped.
+    """
+
+    def __init__(self, store, first_interval=FIRST_INTERVAL_SECONDS):
+        self.store = store
+        self.first_interval = first_interval
+        self._lock = threading.Lock()
+        self._order = {}
+        self._state = {}
+        self._heap = []
+        self._version = None
+        self._rev = 0
+
+    def _sync(self):
+        version = self.store.version()
+        if version != self._version:
+            self._rebuild(version)
+            return
+        for word, due, interval, ease, rev in self.store.reviews(self._rev):
+            self._rev = max(self._rev, rev)
+            if word in self._order and self._state.get(word) != (due, interval, ease):
+                self._state[word] = (due, interval, ease)
+                heapq.heappush(self._heap, (due, self._order[word], word))
+
+    def _rebuild(self, version):
+        words = self.store.words()
+        self._order = {word: i for i, word in enumerate(words)}
+        self._state = {}
+        for word, due, interval, ease, rev in self.store.reviews():
+            self._rev = max(self._rev, rev)
+            if word in self._order:
+                self._state[word] = (due, interval, ease)
+        self._heap = [(self._state.get(word, (0.0,))[0], i, word) for word, i in self._order.items()]
+        heapq.heapify(self._heap)
+        self._version = version
+
+    def _is_current(self, due, word):
+        return word in self._order and self._state.get(word, (0.0,))[0] == due
+
+    def pick(self, k, exclude=()):
+        """Returns the ``k`` most overdue words not in ``exclude``, in vocabulary order.
+
+        The schedule is left as it is.
+        """
+        with self._lock:
+            self._sync()
+            picked, skipped = [], []
+            while self._heap and len(picked) < k:
+                entry = heapq.heappop(self._heap)
+                if not self._is_current(entry[0], entry[2]) or entry in picked or entry in skipped:
+                    continue
+                (skipped if entry[2] in exclude else picked).append(entry)
+            for entry in picked + skipped:
+                heapq.heappush(self._heap, entry)
+        return sorted((word for _, _, word in picked), key=self._order.get)
+
+    def defer(self, words, now=None):
+        """Keeps words that were just served out of picks for ``first_interval`` seconds.
+
+        Unlike a review, their interval and ease stay unchanged until the
+        answer is graded, so an exercise that is never answered counts for
+        nothing.
+        """
+        with self._lock:
+            self._sync()
+            now = time.time() if now is None else now
+            self._update([
+                (word, now + self.first_interval) + self._state.get(word, (0.0, 0.0, DEFAULT_EASE))[1:]
+                for word in dict.fromkeys(words) if word in self._order
+            ])
+
+    def review(self, words, correct=True, now=None):
+        """Reschedules words after a graded answer: further out if correct, soon again if not."""
+        with self._lock:
+            self._sync()
+            now = time.time() if now is None else now
+            updates = []
+            for word in dict.fromkeys(words):
+                if word not in self._order:
+                    continue
+                _, interval, ease = self._state.get(word, (0.0, 0.0, DEFAULT_EASE))
+                if correct:
+                    interval = interval * ease if interval else self.first_interval
+                else:
+                    interval = self.first_interval
+                    ease = max(ease - 0.2, MIN_EASE)
+                updates.append((word, now + interval, interval, ease))
+            self._update(updates)
+
+    def _update(self, updates):
+        """Applies and persists (word, due, interval, ease) rows."""
+        if not updates:
+            return
+        for word, due, interval, ease in updates:
+            self._state[word] = (due, interval, ease)
+            heapq.heappush(self._heap, (due, self._order[word], word))
+
+        self.store.save_reviews(updates)
+        if len(self._heap) > 2 * len(self._order) + 64:
+            self._heap = [(state[0], self._order[word], word) for word, state in self._state.items()]
+            self._heap += [(0.0, i, word) for word, i in self._order.items() if word not in self._state]
+            heapq.heapify(self._heap)
@@ -0,0 +1,218 @@
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from db import ThreadLocalConnection
+
+try:
+    import fcntl
+except ImportError:  # Windows: SQLite's own locking still protects the database
+    fcntl = None
+
+WORDS_DB = os.getenv("WORDS_DB", "words.db")
+# Per-user vocabularies live in one SQLite file per user, spread over
+# WORDS_SHARDS subdirectories of WORDS_DIR.
+WORDS_DIR = os.getenv("WORDS_DIR", "users")
+WORDS_SHARDS = int(os.getenv("WORDS_SHARDS", "256"))
+
+
+def user_words_path(user_id, root=WORDS_DIR, shards=WORDS_SHARDS):
+    """Returns the database file holding one user's vocabulary.
+
+    The files are local SQLite databases in WAL mode, which needs a local
+    disk, so they serve the workers of one host; several nodes keep user
+    data in Redis instead (see redis_store.py).
+    """
+    shard = int(hashlib.sha1(user_id.encode("utf-8")).hexdigest(), 16) % shards
+    return os.path.join(root, f"{shard:03d}", f"{user_id}.db")
+
+
+def user_ids(root=WORDS_DIR):
+    """Yields the ids of all users with a vocabulary under ``root``."""
+    if not os.path.isdir(root):
+        return
+    for shard in os.scandir(root):
+        if shard.is_dir():
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".db"):
+                    yield entry.name[:-len(".db")]
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Holds an exclusive cross-process lock on ``path + '.lock'``."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class WordStore:
+    """Vocabulary store backed by SQLite with an in-memory index.
+
+    Each word is one row, so adding a word is a single insert no matter how
+    large the vocabulary is. Every write bumps a version counter; readers
+    compare it against the version of their in-memory copy and only reload
+    the word list when another thread or worker has changed it. The review
+    schedule (see word_scheduler.py) is kept in the same file.
+    """
+
+    def __init__(self, path=WORDS_DB, seed_json=None):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connect = ThreadLocalConnection(path)
+        self._lock = threading.Lock()
+        self._words = []
+        self._index = set()
+        self._version = None
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS words (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT NOT NULL UNIQUE)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                "word TEXT PRIMARY KEY, due REAL NOT NULL, interval REAL NOT NULL,"
+                " ease REAL NOT NULL, rev INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS reviews_rev ON reviews (rev)")
+            conn.execute("CREATE TABLE IF NOT EXISTS review_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO review_meta (key, value) VALUES ('rev', 0)")
+        if seed_json:
+            self._seed(seed_json)
+
+    def _seed(self, json_path):
+        """Imports a JSON word list the first time the database is created."""
+        with file_lock(self.path):
+            conn = self._connect()
+            if conn.execute("SELECT value FROM meta WHERE key = 'seeded'").fetchone():
+                return
+            self.import_json(json_path)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', 1)")
+
+    def version(self):
+        """Returns the store's version counter, bumped on every change."""
+        (version,) = self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return version
+
+    def _load(self):
+        return [r[0] for r in self._connect().execute("SELECT word FROM words ORDER BY id").fetchall()]
+
+    def _refresh(self):
+        version = self.version()
+        with self._lock:
+            if version == self._version:
+                return
+        words = self._load()
+        with self._lock:
+            self._words = words
+            self._index = set(words)
+            self._version = version
+
+    def words(self):
+        """Returns the word list in insertion order.
+
+        The list is shared between callers and must not be modified.
+        """
+        self._refresh()
+        return self._words
+
+    def __contains__(self, word):
+        self._refresh()
+        return word in self._index
+
+    def __len__(self):
+        self._refresh()
+        return len(self._words)
+
+    def add(self, word):
+        """Adds a word. Returns False if it was already in the store."""
+        return bool(self.add_many([word]))
+
+    def add_many(self, words):
+        """Adds several words in one transaction and returns those that were new."""
+        words = [w for w in dict.fromkeys(words) if w]
+        if not words:
+            return []
+        conn = self._connect()
+        added = []
+        with conn:
+            for word in words:
+                if conn.execute("INSERT OR IGNORE INTO words (word) VALUES (?)", (word,)).rowcount:
+                    added.append(word)
+            if added:
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return added
+
+    def replace(self, words):
+        """Replaces the whole vocabulary with ``words``."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM words")
+            conn.executemany(
+                "INSERT OR IGNORE INTO words (word) VALUES (?)",
+                [(w,) for w in words if w],
+            )
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def reviews(self, since=0):
+        """Returns the (word, due, interval, ease, rev) review rows saved after revision ``since``."""
+        return self._connect().execute(
+            "SELECT word, due, interval, ease, rev FROM reviews WHERE rev > ?", (since,)
+        ).fetchall()
+
+    def save_reviews(self, updates):
+        """Saves (word, due, interval, ease) rows under a new revision number and returns it."""
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE review_meta SET value = value + 1 WHERE key = 'rev'")
+            (rev,) = conn.execute("SELECT value FROM review_meta WHERE key = 'rev'").fetchone()
+            conn.executemany(
+                "INSERT OR REPLACE INTO reviews (word, due, interval, ease, rev) VALUES (?, ?, ?, ?, ?)",
+                [tuple(update) + (rev,) for update in updates],
+            )
+        return rev
+
+    def import_json(self, json_path):
+        """Adds the words from a JSON list file. Returns the words that were new."""
+        if not os.path.exists(json_path):
+            return []
+        with file_lock(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                words = json.load(f)
+        return self.add_many(words)
+
+    def export_json(self, json_path):
+        """Writes the vocabulary to a JSON list file."""
+        words = self.words()
+        tmp_path = json_path + ".tmp"
+        with file_lock(json_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(words, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, json_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4) or sys.argv[1] not in ("import", "export"):
+        sys.exit("usage: python word_store.py import|export FILE.json [USER_ID]")
+    if len(sys.argv) == 4:
+        from users import open_user_store
+        store = open_user_store(sys.argv[3])
+    else:
+        store = WordStore()
+    if sys.argv[1] == "import":
+        print(f"Imported {len(store.import_json(sys.argv[2]))} new words.")
+    else:
+        store.export_json(sys.argv[2])
+        print(f"Exported {len(store)} words.")